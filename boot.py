@@ -0,0 +1,5 @@
+import usb_cdc
+
+# Keep the REPL console and add a second USB serial port for binary
+# telemetry (see tools/telemetry_host.py). Takes effect after a hard reset.
+usb_cdc.enable(console=True, data=True)
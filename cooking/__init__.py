@@ -0,0 +1 @@
+"""Cooking Game modules (imported by code.py)."""
@@ -0,0 +1,214 @@
+"""
+Accelerometer auto-calibration while the device rests in the menu.
+"""
+
+import struct
+import microcontroller
+
+from cooking import input as inp
+from cooking import gestures
+from cooking.crc import crc16
+from cooking.state import NVM_CAL_OFFSET, NVM_CAL_SIZE
+
+
+# ===================== Calibration =====================
+#
+# While the menu is up and the device lies still, every snapshot feeds
+# Welford running statistics (count, mean, sum of squared deviations) for
+# each axis and for the frame-to-frame change of the magnitude: constant
+# memory, no sample buffer. Any movement, or a sample that is not lying
+# flat, starts the window over. After CAL_SAMPLES quiet samples the
+# resting offset and noise give per-device thresholds, which are applied
+# right away and kept in nvm for the next boot. A board that rests but is
+# never level is reported once on the console.
+
+CAL_SAMPLE_MS = 20
+CAL_SAMPLES = 150                       # 3 s of rest
+CAL_GAP_MS = 500                        # longer without samples: start over
+CAL_REST_DELTA_RAW = int(1.0 / inp.ACCEL_MS2_PER_LSB)  # bigger steps = being moved
+
+# Only a board lying flat measures the x offset TILT is judged against.
+# The limits are the ADXL345 datasheet maximums (4 mg per count): zero-g
+# offset +-150 mg on x/y and +-250 mg on z, and 1 g reading anywhere from
+# 230 to 282 counts. Any part within spec calibrates when level.
+ONE_G_RAW = round(9.80665 / inp.ACCEL_MS2_PER_LSB)
+CAL_FLAT_XY_RAW = 38                    # x/y zero-g offset
+CAL_FLAT_Z_RAW = 62 + 32                # z zero-g offset + 1 g sensitivity spread
+CAL_UNLEVEL_REPORT = CAL_SAMPLES        # resting but not level this long: say so
+
+# threshold = mean + k * sigma of the resting magnitude change (x noise
+# for TILT) + a margin for a deliberate move, so a noisier unit or
+# enclosure gets a higher threshold. The floor is only a lower bound, the
+# fixed defaults in cooking.gestures the upper one. WRONG_SHAKE is a
+# penalty and never goes below its default; noise can only raise it.
+MIX_SIGMAS = 10
+WRONG_SHAKE_SIGMAS = 14
+TILT_SIGMAS = 10
+MIX_MARGIN_RAW = round(2.5 / inp.ACCEL_MS2_PER_LSB)
+WRONG_SHAKE_MARGIN_RAW = round(4.5 / inp.ACCEL_MS2_PER_LSB)
+TILT_MARGIN_RAW = round(3.5 / inp.ACCEL_MS2_PER_LSB)
+MIX_FLOOR_RAW = round(2.0 / inp.ACCEL_MS2_PER_LSB)
+TILT_FLOOR_RAW = round(2.5 / inp.ACCEL_MS2_PER_LSB)
+WRONG_SHAKE_MAX_RAW = round(8.0 / inp.ACCEL_MS2_PER_LSB)
+
+CAL_WRITE_TOLERANCE_RAW = 3             # smaller changes are not worth a flash write
+
+# magic, version, rest x/y/z, noise sigma x/y/z (1/16 count),
+# mix / wrong shake / tilt thresholds (raw), CRC-16
+CAL_FMT = "<BBhhhHHHHHHH"
+CAL_SIZE = struct.calcsize(CAL_FMT)
+CAL_MAGIC = 0xCA
+CAL_VERSION = 2
+
+cal_n = 0
+cal_mean = [0.0, 0.0, 0.0, 0.0]         # x, y, z, magnitude change
+cal_m2 = [0.0, 0.0, 0.0, 0.0]
+cal_last_mag = 0
+cal_last_ms = 0
+cal_done = False                        # one calibration per boot
+cal_unlevel = 0                         # resting samples in a row that were not level
+
+stored = None                           # last record read from / written to nvm
+
+
+def restart():
+    """Drop the running statistics (movement, or a gap in sampling)."""
+    global cal_n, cal_last_mag
+    cal_n = 0
+    cal_last_mag = 0
+    for i in range(4):
+        cal_mean[i] = 0.0
+        cal_m2[i] = 0.0
+
+
+def welford_add(i, value):
+    delta = value - cal_mean[i]
+    cal_mean[i] += delta / cal_n
+    cal_m2[i] += delta * (value - cal_mean[i])
+
+
+def sigma(i):
+    if cal_n < 2:
+        return 0.0
+    return (cal_m2[i] / (cal_n - 1)) ** 0.5
+
+
+def clamp(value, low, high):
+    return max(low, min(high, int(value)))
+
+
+def lying_flat():
+    """The snapshot reads 1 g straight down z (face up or down), within part tolerance."""
+    return (abs(inp.snap_x) <= CAL_FLAT_XY_RAW and abs(inp.snap_y) <= CAL_FLAT_XY_RAW
+            and abs(abs(inp.snap_z) - ONE_G_RAW) <= CAL_FLAT_Z_RAW)
+
+
+def update(now):
+    """Menu hook: take one sample every CAL_SAMPLE_MS until calibrated."""
+    global cal_n, cal_last_mag, cal_last_ms, cal_unlevel
+
+    if cal_done or now - cal_last_ms < CAL_SAMPLE_MS:
+        return
+    if now - cal_last_ms > CAL_GAP_MS:
+        restart()
+    cal_last_ms = now
+
+    inp.accel_snapshot()
+    if cal_last_mag == 0:
+        cal_last_mag = inp.snap_mag
+        return
+    change = abs(inp.snap_mag - cal_last_mag)
+    cal_last_mag = inp.snap_mag
+    if change > CAL_REST_DELTA_RAW:
+        restart()
+        cal_unlevel = 0
+        return
+    if not lying_flat():
+        restart()
+        cal_last_mag = inp.snap_mag     # still resting: keep checking for movement
+        cal_unlevel += 1
+        if cal_unlevel == CAL_UNLEVEL_REPORT:
+            print("CAL waiting: not level x={} y={} z={} (|x|,|y| <= {}, |z| {}+-{})".format(
+                inp.snap_x, inp.snap_y, inp.snap_z, CAL_FLAT_XY_RAW, ONE_G_RAW, CAL_FLAT_Z_RAW))
+        return
+    cal_unlevel = 0
+
+    cal_n += 1
+    welford_add(0, inp.snap_x)
+    welford_add(1, inp.snap_y)
+    welford_add(2, inp.snap_z)
+    welford_add(3, change)
+
+    if cal_n >= CAL_SAMPLES:
+        finish()
+
+
+def finish():
+    """Turn the statistics into thresholds, apply them and persist them."""
+    global cal_done
+
+    cal_done = True
+    change_mean = cal_mean[3]
+    change_sigma = sigma(3)
+
+    values = (
+        round(cal_mean[0]), round(cal_mean[1]), round(cal_mean[2]),    # within the flat limits
+        min(int(sigma(0) * 16), 0xFFFF),
+        min(int(sigma(1) * 16), 0xFFFF),
+        min(int(sigma(2) * 16), 0xFFFF),
+        clamp(change_mean + MIX_SIGMAS * change_sigma + MIX_MARGIN_RAW,
+              MIX_FLOOR_RAW, gestures.SHAKE_THRESHOLD_RAW),
+        clamp(change_mean + WRONG_SHAKE_SIGMAS * change_sigma + WRONG_SHAKE_MARGIN_RAW,
+              gestures.SHAKE_THRESHOLD_RAW, WRONG_SHAKE_MAX_RAW),
+        clamp(TILT_SIGMAS * sigma(0) + TILT_MARGIN_RAW,
+              TILT_FLOOR_RAW, gestures.TILT_THRESHOLD_RAW),
+    )
+    apply(values)
+    written = save(values)
+    print("CAL rest={},{},{} sigma16={},{},{} mix={} wrong={} tilt={} stored={}".format(
+        *values, int(written)))
+
+
+def apply(values):
+    gestures.tilt_offset_x = values[0]
+    gestures.mix_threshold_raw = values[6]
+    gestures.wrong_shake_threshold_raw = values[7]
+    gestures.tilt_threshold_raw = values[8]
+
+
+def changed(values):
+    if stored is None:
+        return True
+    for i in (0, 6, 7, 8):
+        if abs(values[i] - stored[i]) > CAL_WRITE_TOLERANCE_RAW:
+            return True
+    return False
+
+
+def save(values):
+    """Write the record unless nvm already holds (nearly) the same one."""
+    global stored
+    if microcontroller.nvm is None or not changed(values):
+        return False
+    record = bytearray(CAL_SIZE)
+    struct.pack_into(CAL_FMT, record, 0, CAL_MAGIC, CAL_VERSION, *values, 0)
+    struct.pack_into("<H", record, CAL_SIZE - 2, crc16(record[:-2]))
+    microcontroller.nvm[NVM_CAL_OFFSET:NVM_CAL_OFFSET + CAL_SIZE] = record
+    stored = values
+    return True
+
+
+def load():
+    """Apply the calibration stored in nvm; False if there is none (boot)."""
+    global stored
+    nvm = microcontroller.nvm
+    if nvm is None or len(nvm) < NVM_CAL_OFFSET + NVM_CAL_SIZE:
+        return False
+    record = bytes(nvm[NVM_CAL_OFFSET:NVM_CAL_OFFSET + CAL_SIZE])
+    if record[0] != CAL_MAGIC or record[1] != CAL_VERSION:
+        return False
+    if crc16(record[:-2]) != struct.unpack_from("<H", record, CAL_SIZE - 2)[0]:
+        return False
+    stored = struct.unpack(CAL_FMT, record)[2:-1]
+    apply(stored)
+    return True
@@ -0,0 +1,198 @@
+"""
+Power-loss-safe checkpoint of the running game in nvm.
+
+Every function takes the nvm object as an argument rather than importing
+microcontroller, so tools/checkpoint_sim.py can cut power mid-write on a
+file-backed stand-in and check what the next boot reads back.
+"""
+
+import struct
+import time
+
+from cooking.crc import crc16
+from cooking.state import (
+    ACTION_NAMES, DIFFICULTY_NAMES, NVM_CHECKPOINT_OFFSET, NVM_CHECKPOINT_SIZE,
+    STATE_MENU, STATE_PLAYING,
+)
+
+
+# ===================== Checkpoint =====================
+#
+# The session (state, difficulty, step, score, RHYTHM counts, recipe) is
+# packed into one small record. Records go to two slots in turn, each with
+# a sequence number and a CRC, so a write torn by a brown-out can only
+# damage the older slot: load() takes the newest slot that checks out.
+#
+# Cleared steps are only staged. The staged record is written once
+# COALESCE_STEPS steps have piled up or the oldest unwritten step has
+# waited COALESCE_MS, checked in the quiet frames right after a step
+# change, so flash is not written every step and never mid-gesture. A
+# reset loses at most those few steps.
+
+CP_MAGIC = 0xC5
+CP_VERSION = 1
+CP_RECIPE_MAX = 24
+
+# magic, version, sequence, state, difficulty, step, score,
+# PERFECT / GOOD / MISS, recipe length, recipe (one action per byte), CRC-16
+CP_FMT = f"<BBHBBBHBBBB{CP_RECIPE_MAX}sH"
+CP_SIZE = struct.calcsize(CP_FMT)
+CP_SLOTS = NVM_CHECKPOINT_SIZE // CP_SIZE
+
+COALESCE_STEPS = 3
+COALESCE_MS = 8000
+
+seq = 0                 # sequence number of the newest record in nvm
+slot = 0                # slot that record is in
+pending = None          # session staged but not written yet
+pending_steps = 0
+pending_ms = 0          # when the oldest unwritten step was staged
+clear_in_nvm = True     # nvm holds no session (nothing to clear)
+
+writes = 0
+coalesced = 0           # staged steps that never needed their own write
+last_write_us = 0
+max_write_us = 0
+
+
+def slot_offset(index):
+    return NVM_CHECKPOINT_OFFSET + index * CP_SIZE
+
+
+def pack(sequence, session):
+    """Record bytes for (state, difficulty, step, score, counts, recipe)."""
+    state, difficulty, step, score, counts, recipe = session
+    assert len(recipe) <= CP_RECIPE_MAX, "recipe longer than a checkpoint holds"
+    record = bytearray(CP_SIZE)
+    struct.pack_into(
+        CP_FMT, record, 0,
+        CP_MAGIC, CP_VERSION, sequence & 0xFFFF,
+        state, difficulty, step, min(score, 0xFFFF),
+        min(counts[0], 255), min(counts[1], 255), min(counts[2], 255),
+        len(recipe), bytes(recipe), 0,
+    )
+    struct.pack_into("<H", record, CP_SIZE - 2, crc16(record[:-2]))
+    return record
+
+
+def unpack(record):
+    """(sequence, session) from record bytes, or None if it does not check out."""
+    if len(record) < CP_SIZE or record[0] != CP_MAGIC or record[1] != CP_VERSION:
+        return None
+    if crc16(record[:CP_SIZE - 2]) != struct.unpack_from("<H", record, CP_SIZE - 2)[0]:
+        return None
+    (_, _, sequence, state, difficulty, step, score,
+     perfect, good, miss, length, recipe, _) = struct.unpack(CP_FMT, record)
+    recipe = list(recipe[:length])
+    if state == STATE_PLAYING:
+        if difficulty >= len(DIFFICULTY_NAMES) or step >= length:
+            return None
+        for action in recipe:
+            if action >= len(ACTION_NAMES):
+                return None
+    return sequence, (state, difficulty, step, score, [perfect, good, miss], recipe)
+
+
+def newer(a, b):
+    """True if sequence number a comes after b (16-bit wrap-around)."""
+    return 0 < ((a - b) & 0xFFFF) < 0x8000
+
+
+def load(nvm):
+    """
+    Newest valid session in nvm, or None if there is no game to resume (boot).
+
+    Also picks up the sequence number and slot so later writes continue
+    after it.
+    """
+    global seq, slot, pending, pending_steps, clear_in_nvm
+
+    pending = None
+    pending_steps = 0
+    seq = 0
+    slot = CP_SLOTS - 1         # so the first write goes to slot 0
+    best = None
+    if nvm is None or len(nvm) < NVM_CHECKPOINT_OFFSET + NVM_CHECKPOINT_SIZE:
+        return None
+
+    for index in range(CP_SLOTS):
+        start = slot_offset(index)
+        found = unpack(bytes(nvm[start:start + CP_SIZE]))
+        if found is None:
+            continue
+        if best is None or newer(found[0], seq):
+            seq = found[0]
+            slot = index
+            best = found[1]
+
+    clear_in_nvm = best is None or best[0] != STATE_PLAYING
+    if clear_in_nvm:
+        return None
+    return best
+
+
+def write(nvm, session):
+    """Write a record to the older slot now; returns the write time in us."""
+    global seq, slot, writes, last_write_us, max_write_us, clear_in_nvm
+
+    seq = (seq + 1) & 0xFFFF
+    slot = (slot + 1) % CP_SLOTS
+    record = pack(seq, session)
+    start = slot_offset(slot)
+
+    t0 = time.monotonic_ns()
+    nvm[start:start + CP_SIZE] = record
+    last_write_us = (time.monotonic_ns() - t0) // 1000
+
+    writes += 1
+    if last_write_us > max_write_us:
+        max_write_us = last_write_us
+    clear_in_nvm = session[0] != STATE_PLAYING
+    return last_write_us
+
+
+def save_now(nvm, session):
+    """Write immediately (a new game), dropping anything staged."""
+    global pending, pending_steps
+    pending = None
+    pending_steps = 0
+    if nvm is None:
+        return -1
+    return write(nvm, session)
+
+
+def stage(session, now):
+    """A step was cleared: remember the session, write it later (coalesced)."""
+    global pending, pending_steps, pending_ms, coalesced
+    if pending is not None:
+        coalesced += 1
+    else:
+        pending_ms = now
+    pending = session
+    pending_steps += 1
+
+
+def due(now):
+    return pending is not None and (
+        pending_steps >= COALESCE_STEPS or now - pending_ms >= COALESCE_MS)
+
+
+def flush(nvm, now, force=False):
+    """Write the staged session if it is due; returns the write time in us or -1."""
+    global pending, pending_steps
+    if pending is None or nvm is None or not (force or due(now)):
+        return -1
+    session = pending
+    pending = None
+    pending_steps = 0
+    return write(nvm, session)
+
+
+def clear(nvm):
+    """The game ended: make sure the next boot does not resume it."""
+    global pending, pending_steps
+    pending = None
+    pending_steps = 0
+    if nvm is None or clear_in_nvm:
+        return -1
+    return write(nvm, (STATE_MENU, 0, 0, 0, [0, 0, 0], []))
@@ -0,0 +1,21 @@
+"""
+CRC-16/CCITT for the records kept in microcontroller.nvm.
+"""
+
+
+def crc16(data):
+    """
+    CRC-16/CCITT (poly 0x1021, init 0xFFFF) of a bytes-like object.
+
+    16 bits because a torn write leaves a mix of new and old bytes that an
+    8-bit check would pass 1 time in 256.
+    """
+    crc = 0xFFFF
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            if crc & 0x8000:
+                crc = ((crc << 1) ^ 0x1021) & 0xFFFF
+            else:
+                crc = (crc << 1) & 0xFFFF
+    return crc
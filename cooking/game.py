@@ -0,0 +1,477 @@
+"""
+Game flow: recipes, RHYTHM mode, state transitions and the main loop.
+"""
+
+import gc
+import time
+import microcontroller
+
+from cooking import rhythm
+from cooking import hardware as hw
+from cooking import input as inp
+from cooking import state as st
+from cooking.state import (
+    ACTION_ADD, ACTION_FLIP, ACTION_HEAT, ACTION_MIX, ACTION_STIR, ACTION_TILT,
+    DIFFICULTY_EASY, DIFFICULTY_HARD, DIFFICULTY_NAMES, DIFFICULTY_NORMAL,
+    DIFFICULTY_RHYTHM, HEAT_CLEAR_SHOW_MS, HEAT_TIMEOUT_MS,
+    MENU_TICKS_PER_STEP, RHYTHM_BEATS_PER_STEP, RHYTHM_BPM, RHYTHM_CUE_ON_NS,
+    RHYTHM_LEAD_IN_BEATS, RHYTHM_LED_LEAD_NS, RHYTHM_MAX_MISSES,
+    RHYTHM_OLED_LEAD_NS, RHYTHM_POINTS, STATE_GAME_OVER, STATE_GAME_WIN,
+    STATE_MENU, STATE_PLAYING, STEP_POINTS,
+)
+from cooking import render
+from cooking import gestures
+from cooking import calibration
+from cooking import screens
+from cooking import telemetry as tel
+from cooking import qos
+from cooking import checkpoint
+
+
+# ===================== Recipes =====================
+
+def make_easy_recipe():
+    return [
+        ACTION_ADD, ACTION_ADD, ACTION_ADD,
+        ACTION_HEAT,
+        ACTION_MIX, ACTION_TILT,
+        ACTION_ADD, ACTION_MIX, ACTION_TILT, ACTION_ADD
+    ]
+
+
+def make_normal_recipe():
+    return [
+        ACTION_ADD, ACTION_ADD, ACTION_MIX,
+        ACTION_HEAT,
+        ACTION_TILT, ACTION_ADD, ACTION_STIR, ACTION_MIX,
+        ACTION_HEAT,
+        ACTION_TILT, ACTION_MIX, ACTION_ADD, ACTION_MIX
+    ]
+
+
+def make_hard_recipe():
+    return [
+        ACTION_ADD, ACTION_MIX, ACTION_ADD,
+        ACTION_HEAT,
+        ACTION_TILT, ACTION_TILT, ACTION_MIX, ACTION_ADD,
+        ACTION_HEAT,
+        ACTION_STIR, ACTION_FLIP,
+        ACTION_MIX, ACTION_TILT,
+        ACTION_HEAT,
+        ACTION_ADD, ACTION_MIX, ACTION_FLIP, ACTION_TILT
+    ]
+
+
+# ===================== RHYTHM mode =====================
+#
+# Step i must land on beat RHYTHM_LEAD_IN_BEATS + i * RHYTHM_BEATS_PER_STEP.
+# Beat times come from rhythm.beat_time_ns() (no accumulated drift) and
+# inputs are judged by the instant they were sampled, not by when the loop
+# got around to looking at them.
+
+def rhythm_start(now_ns):
+    st.rhythm_origin_ns = now_ns
+    st.rhythm_led_beat = 0
+    st.rhythm_dot_beat = 0
+    st.rhythm_led_off_ns = 0
+    st.rhythm_dot_off_ns = 0
+    st.rhythm_last_text = ""
+    st.rhythm_counts[0] = st.rhythm_counts[1] = st.rhythm_counts[2] = 0
+
+
+def rhythm_step_beat(step):
+    return RHYTHM_LEAD_IN_BEATS + step * RHYTHM_BEATS_PER_STEP
+
+
+def rhythm_step_ns(step):
+    return rhythm.beat_time_ns(st.rhythm_origin_ns, RHYTHM_BPM, rhythm_step_beat(step))
+
+
+def rhythm_next_beat(beat, lead_ns, now_ns):
+    """Skip beats whose cue time already passed (after a long frame)."""
+    late = rhythm.beat_at_or_after(st.rhythm_origin_ns, RHYTHM_BPM, now_ns + lead_ns)
+    return max(beat, late)
+
+
+def rhythm_update_cues(now_ns, expected):
+    """
+    Fire pre-scheduled beat cues.
+
+    Each cue is due a fixed lead time before its beat (roughly the time the
+    output takes to become visible), so it shows up on the beat instead of
+    one frame late. HEAT steps keep the NeoPixel for the heat level.
+    """
+    # OLED dot
+    beat_ns = rhythm.beat_time_ns(st.rhythm_origin_ns, RHYTHM_BPM, st.rhythm_dot_beat)
+    if now_ns >= beat_ns - RHYTHM_OLED_LEAD_NS:
+        render.hud_set_beat_dot(True)
+        st.rhythm_dot_off_ns = beat_ns + RHYTHM_CUE_ON_NS
+        st.rhythm_dot_beat = rhythm_next_beat(st.rhythm_dot_beat + 1, RHYTHM_OLED_LEAD_NS, now_ns)
+    elif st.rhythm_dot_off_ns and now_ns >= st.rhythm_dot_off_ns:
+        render.hud_set_beat_dot(False)
+        st.rhythm_dot_off_ns = 0
+
+    if expected == ACTION_HEAT:
+        return
+
+    # NeoPixel: bright on action beats, dim on the beats in between
+    if not qos.allow(qos.SHED_LED):
+        # frames are running late: keep the LED dark but the beat index current
+        if st.rhythm_led_off_ns:
+            render.pixels_off()
+            st.rhythm_led_off_ns = 0
+        st.rhythm_led_beat = rhythm_next_beat(st.rhythm_led_beat, RHYTHM_LED_LEAD_NS, now_ns)
+        return
+
+    beat_ns = rhythm.beat_time_ns(st.rhythm_origin_ns, RHYTHM_BPM, st.rhythm_led_beat)
+    if now_ns >= beat_ns - RHYTHM_LED_LEAD_NS:
+        beat = st.rhythm_led_beat - RHYTHM_LEAD_IN_BEATS
+        if beat >= 0 and beat % RHYTHM_BEATS_PER_STEP == 0:
+            hw.pixels.fill((255, 255, 255))
+        else:
+            hw.pixels.fill((0, 0, 60))
+        hw.pixels.show()
+        st.rhythm_led_off_ns = beat_ns + RHYTHM_CUE_ON_NS
+        st.rhythm_led_beat = rhythm_next_beat(st.rhythm_led_beat + 1, RHYTHM_LED_LEAD_NS, now_ns)
+    elif st.rhythm_led_off_ns and now_ns >= st.rhythm_led_off_ns:
+        render.pixels_off()
+        st.rhythm_led_off_ns = 0
+
+
+def rhythm_stop_cues():
+    render.hud_set_beat_dot(False)
+    render.pixels_off()
+
+
+def rhythm_judge(expected, judgment, offset_ns):
+    """Score one judged step; returns False when the misses end the game."""
+    st.rhythm_counts[judgment] += 1
+    st.score += RHYTHM_POINTS[judgment]
+
+    offset_ms = offset_ns // rhythm.NS_PER_MS
+    if judgment == rhythm.JUDGE_MISS:
+        st.rhythm_last_text = "MISS"
+    else:
+        st.rhythm_last_text = f"{rhythm.JUDGE_NAMES[judgment]} {offset_ms:+d}ms"
+
+    tel.record_step(tel.EV_PERFECT + judgment, expected, abs(offset_ms))
+    return st.rhythm_counts[rhythm.JUDGE_MISS] < RHYTHM_MAX_MISSES
+
+
+def make_rhythm_recipe():
+    return [
+        ACTION_ADD, ACTION_MIX, ACTION_ADD, ACTION_TILT,
+        ACTION_HEAT,
+        ACTION_ADD, ACTION_MIX, ACTION_TILT, ACTION_ADD,
+        ACTION_HEAT,
+        ACTION_MIX, ACTION_TILT,
+    ]
+
+
+# ===================== State transitions =====================
+
+def set_difficulty(selected):
+    """Difficulty, its recipe and its time limit."""
+    st.difficulty = selected
+
+    if st.difficulty == DIFFICULTY_EASY:
+        st.recipe = make_easy_recipe()
+        st.time_limit_ms = 5000
+    elif st.difficulty == DIFFICULTY_NORMAL:
+        st.recipe = make_normal_recipe()
+        st.time_limit_ms = 4000
+    elif st.difficulty == DIFFICULTY_HARD:
+        st.recipe = make_hard_recipe()
+        st.time_limit_ms = 3000
+    else:
+        st.recipe = make_rhythm_recipe()
+        # the beat grid decides timing; this only sizes the first countdown bar
+        st.time_limit_ms = RHYTHM_LEAD_IN_BEATS * 60000 // RHYTHM_BPM
+
+
+def begin_playing():
+    st.state = STATE_PLAYING
+    screens.clear_prefetch()
+    qos.reset()
+    st.move_start_ms = hw.now_ms()
+    st.last_step_change_ms = st.move_start_ms
+
+
+def start_game(selected):
+    """Initialize a new game for the chosen difficulty."""
+    set_difficulty(selected)
+    if st.difficulty == DIFFICULTY_RHYTHM:
+        rhythm_start(time.monotonic_ns())
+
+    st.current_step = 0
+    st.score = 0
+    begin_playing()
+    save_checkpoint()
+
+    tel.record_step(tel.EV_START, tel.NO_ACTION, 0)
+    screens.show_current_step()
+
+
+def resume_game(session):
+    """Pick a checkpointed game up again at the step a reset interrupted."""
+    _, difficulty, step, score, counts, recipe = session
+    set_difficulty(difficulty)
+    st.recipe = recipe
+    if st.difficulty == DIFFICULTY_RHYTHM:
+        # shift the beat grid so this step's beat follows the usual lead-in
+        beats = step * RHYTHM_BEATS_PER_STEP
+        rhythm_start(time.monotonic_ns() - rhythm.beat_time_ns(0, RHYTHM_BPM, beats))
+        st.rhythm_led_beat = beats
+        st.rhythm_dot_beat = beats
+        st.rhythm_counts[:] = counts
+
+    st.current_step = step
+    st.score = score
+    begin_playing()
+
+    tel.record_step(tel.EV_RESUME, tel.NO_ACTION, 0)
+    screens.show_current_step()
+
+
+def update_playing():
+    """Main per-frame update while the game is in PLAYING state."""
+    gestures.poll_inputs()
+    now = hw.now_ms()
+
+    # keep HEAT OK screen visible for a short time
+    if st.heat_just_cleared:
+        if now - st.heat_clear_ms < HEAT_CLEAR_SHOW_MS:
+            return
+        st.heat_just_cleared = False
+        st.move_start_ms = now
+        st.last_step_change_ms = now
+
+    expected = st.recipe[st.current_step]
+
+    if st.difficulty == DIFFICULTY_RHYTHM:
+        now_ns = time.monotonic_ns()
+        rhythm_update_cues(now_ns, expected)
+        target_ns = rhythm_step_ns(st.current_step)
+
+        # countdown bar runs out exactly on the target beat
+        limit_ms = max(1, target_ns // rhythm.NS_PER_MS - st.move_start_ms)
+        render.hud_update_bar(now - st.move_start_ms, limit_ms, now)
+
+        # nothing landed inside the window: MISS and move on with the beat
+        # (a TILT / HEAT hold that started inside it keeps the step open)
+        if rhythm.step_missed(now_ns, target_ns, gestures.hold_onset_ns(expected)):
+            if rhythm_judge(expected, rhythm.JUDGE_MISS, now_ns - target_ns):
+                advance_step(now)
+            else:
+                game_over("TOO MANY MISSES")
+            return
+
+    # countdown bar (HEAT has its own, longer limit)
+    elif expected == ACTION_HEAT:
+        render.hud_update_bar(now - st.move_start_ms, HEAT_TIMEOUT_MS, now)
+    else:
+        render.hud_update_bar(now - st.move_start_ms, st.time_limit_ms, now)
+
+    # generic timeout (HEAT and RHYTHM have their own)
+    if expected != ACTION_HEAT and st.difficulty != DIFFICULTY_RHYTHM:
+        if now - st.move_start_ms > st.time_limit_ms:
+            tel.record_step(tel.EV_TIMEOUT, expected, now - st.move_start_ms)
+            game_over("TIME OUT")
+            return
+
+    # ignore sensor noise right after a step change (a good time to prefetch
+    # and to write a due checkpoint)
+    if now - st.last_step_change_ms < 200:
+        screens.prefetch_next()
+        flush_checkpoint(now)
+        return
+
+    action = gestures.get_player_action(expected)
+    gestures.report_detectors(expected, now)
+
+    if action is None:
+        screens.prefetch_next()
+        return
+
+    if action == "TIMEOUT_HEAT":
+        tel.record_step(tel.EV_HEAT_TIMEOUT, expected, now - st.move_start_ms)
+        game_over("HEAT TIMEOUT")
+        return
+
+    # all modes but Easy: shaking during ADD is a wrong move
+    if st.difficulty != DIFFICULTY_EASY and action == "WRONG_SHAKE":
+        tel.record_step(tel.EV_WRONG_MOVE, expected, now - st.move_start_ms)
+        game_over("WRONG MOVE")
+        return
+
+    if st.difficulty == DIFFICULTY_RHYTHM:
+        # judged by when the input was sampled, against the step's beat
+        offset_ns = gestures.input_event_ns - rhythm_step_ns(st.current_step)
+        if rhythm.too_early(offset_ns):
+            return      # not meant for this beat: the step stays open
+        if not rhythm_judge(expected, rhythm.judge(offset_ns), offset_ns):
+            game_over("TOO MANY MISSES")
+            return
+        advance_step(now)
+        return
+
+    # correct move → give score
+    st.score += STEP_POINTS[st.difficulty]
+
+    tel.record_step(tel.EV_CLEAR, expected, now - st.move_start_ms)
+    advance_step(now)
+
+
+def advance_step(now):
+    """Move on to the next recipe step, or to the win screen after the last one."""
+    t0 = time.monotonic_ns()
+    st.current_step += 1
+
+    if st.current_step >= len(st.recipe):
+        tel.record_step(tel.EV_WIN, tel.NO_ACTION, 0)
+        end_game(STATE_GAME_WIN)
+        screens.show_game_win()
+        return
+
+    st.move_start_ms = now
+    st.last_step_change_ms = now
+
+    prefetched = screens.prefetched()
+    screens.show_current_step()
+    tel.record_transition(prefetched, (time.monotonic_ns() - t0) // 1000)
+    checkpoint.stage(session(), now)
+
+
+def end_game(state):
+    """
+    Leave PLAYING. The checkpoint is cleared before the end screen, which
+    blocks for seconds: a reset during it must not resume a finished game.
+    """
+    st.state = state
+    if st.difficulty == DIFFICULTY_RHYTHM:
+        rhythm_stop_cues()
+    clear_checkpoint()
+
+
+def game_over(reason):
+    end_game(STATE_GAME_OVER)
+    screens.show_game_over(reason)
+
+
+# ===================== Checkpoint =====================
+#
+# cooking.checkpoint keeps the running game in nvm so a reset or power
+# loss resumes it at boot. A new game is written at once, cleared steps
+# are coalesced and written right after a later step change, a finished
+# game is cleared.
+
+def session():
+    return (st.state, st.difficulty, st.current_step, st.score,
+            list(st.rhythm_counts), st.recipe)
+
+
+def checkpoint_written(write_us):
+    if write_us >= 0:
+        tel.record_checkpoint(write_us, checkpoint.writes, checkpoint.coalesced)
+
+
+def save_checkpoint():
+    checkpoint_written(checkpoint.save_now(microcontroller.nvm, session()))
+
+
+def flush_checkpoint(now):
+    """
+    Write the staged steps if they are due. Only called in the quiet
+    frames right after a step change, so the flash write never stalls
+    sampling while a move is being judged.
+    """
+    if checkpoint.due(now):
+        qos.exempt_frame()          # a flash write is planned work
+        checkpoint_written(checkpoint.flush(microcontroller.nvm, now))
+
+
+def clear_checkpoint():
+    checkpoint_written(checkpoint.clear(microcontroller.nvm))
+
+
+# ===================== Main loop =====================
+
+def import_stats(boot_ns):
+    """(import_ms, mem_free, mem_alloc) right after the game modules are imported."""
+    import_ms = (time.monotonic_ns() - boot_ns) // 1_000_000
+    gc.collect()
+    return import_ms, gc.mem_free(), gc.mem_alloc()
+
+
+def boot_report(stats, calibrated, resumed, resume_ms):
+    """
+    One console line per boot, so the .py and .mpy builds can be compared
+    (tools/build.py --boot-log). import_ms and the heap numbers are taken
+    before calibration, checkpoint and resume work (import_stats()).
+    ready_ms is time.monotonic_ns() since reset: supervisor.ticks_ms()
+    starts offset to wrap about a minute in, so it is no clock for this.
+    After a resume, ready_ms is the time from reset to the interrupted step
+    being back on screen, and resume_ms the part of it spent reading the
+    checkpoint and rebuilding the step.
+    """
+    import_ms, mem_free, mem_alloc = stats
+    build = "mpy" if __file__.endswith(".mpy") else "py"
+    print(f"BOOT build={build} import_ms={import_ms} ready_ms={time.monotonic_ns() // 1_000_000} "
+          f"mem_free={mem_free} mem_alloc={mem_alloc} cal={int(calibrated)} "
+          f"resume={int(resumed)} resume_ms={resume_ms}")
+
+
+def run(boot_ns):
+    """Splash and menu (or straight back into a checkpointed game), then the main loop."""
+    stats = import_stats(boot_ns)
+    print("Booting Cooking Game...")
+    calibrated = calibration.load()
+    resume_ns = time.monotonic_ns()
+    saved = checkpoint.load(microcontroller.nvm)
+    if saved is not None:
+        resume_game(saved)
+    resume_ms = (time.monotonic_ns() - resume_ns) // 1_000_000
+    boot_report(stats, calibrated, saved is not None, resume_ms)
+    if saved is None:
+        screens.show_splash()
+        screens.show_menu()
+
+    while True:
+        inp.begin_frame()
+        playing = st.state == STATE_PLAYING
+
+        if st.state == STATE_MENU:
+            inp.update_encoder()
+            calibration.update(hw.now_ms())
+
+            step = inp.enc_pos // MENU_TICKS_PER_STEP
+            if step != st.last_menu_pos:
+                if step > st.last_menu_pos:
+                    st.menu_index = (st.menu_index + 1) % len(DIFFICULTY_NAMES)
+                else:
+                    st.menu_index = (st.menu_index - 1) % len(DIFFICULTY_NAMES)
+                st.last_menu_pos = step
+                screens.show_menu()
+
+            if inp.update_button():
+                inp.wait_release()
+                start_game(st.menu_index)
+
+        elif st.state == STATE_PLAYING:
+            update_playing()
+            if st.state != STATE_PLAYING:
+                inp.clear_button()      # presses during the game are not "back to menu"
+
+        elif st.state in (STATE_GAME_OVER, STATE_GAME_WIN):
+            if inp.update_button():
+                inp.wait_release()
+                st.state = STATE_MENU
+                screens.show_menu()
+
+        render.capture_frame()
+        tel.flush()
+        if playing and st.state == STATE_PLAYING:
+            # frames that start or end a game block on purpose (splash, flashes)
+            qos.end_frame()
+            qos.report(hw.now_ms())
+        time.sleep(0.01)
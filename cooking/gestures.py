@@ -0,0 +1,508 @@
+"""
+Action detectors: button, encoder and accelerometer gestures.
+"""
+
+import time
+
+from cooking import hardware as hw
+from cooking import input as inp
+from cooking import state as st
+from cooking.state import (
+    ACTION_ADD, ACTION_FLIP, ACTION_HEAT, ACTION_MIX, ACTION_STIR, ACTION_TILT,
+    DIFFICULTY_EASY, DIFFICULTY_RHYTHM,
+    HEAT_DRAW_THROTTLE_MS, HEAT_HIGH, HEAT_HOLD_MS, HEAT_LOW, HEAT_MID,
+    HEAT_NAMES, HEAT_NONE, HEAT_TICKS_REQUIRED, HEAT_TIMEOUT_MS,
+    RHYTHM_HEAT_HOLD_MS,
+)
+from cooking import render
+from cooking import telemetry as tel
+from cooking import qos
+
+
+# ===================== Accelerometer (MIX / TILT) =====================
+
+last_mag = 0            # previous snap_mag (raw counts)
+last_shake_ms = 0
+last_tilt_ms = 0
+
+mix_spike_count = 0
+mix_spike_window_ms = 250
+last_mix_spike_ms = 0
+
+SHAKE_THRESHOLD = 5.5       # m/s^2
+TILT_THRESHOLD = 6.5        # m/s^2
+SHAKE_THRESHOLD_RAW = int(SHAKE_THRESHOLD / inp.ACCEL_MS2_PER_LSB)
+TILT_THRESHOLD_RAW = int(TILT_THRESHOLD / inp.ACCEL_MS2_PER_LSB)
+
+# per-device values set by cooking.calibration; the fixed defaults above
+# are the fallback for an uncalibrated board
+mix_threshold_raw = SHAKE_THRESHOLD_RAW
+wrong_shake_threshold_raw = SHAKE_THRESHOLD_RAW
+tilt_threshold_raw = TILT_THRESHOLD_RAW
+tilt_offset_x = 0           # resting x bias of a level board (cooking.calibration)
+COOLDOWN_MS = 800
+
+ACTION_LOCK_MS = 400
+last_action_ms = 0
+
+tilt_hold_start_ms = 0
+tilt_hold_start_ns = 0
+tilt_hold_active = False
+
+# sample instant of the input that produced the last action (RHYTHM judging)
+input_event_ns = 0
+
+
+# ===================== Input handling =====================
+#
+# Each action is recognised by one or more detector plugins registered in
+# DETECTORS. A detector declares the sensors it reads, how often it needs
+# to run and its expected per-frame cost; run_detectors() only runs the
+# detectors of the current recipe step and skips an optional one when it
+# would push the frame past qos.FRAME_DEADLINE_US, the one frame budget.
+#
+# The declared sensors are what run_detectors() reads, each at most once
+# per frame (sample_inputs()): the accelerometer and the button queue
+# right before a detector that needs them runs. The encoder is the
+# exception and is polled every PLAYING frame whatever the step
+# (poll_inputs()): its debouncers only report detents they are polled
+# through, and state gone stale during other steps would surface as a
+# spurious detent once a HEAT or STIR step starts.
+#
+# Every detector that returns an action also sets input_event_ns to the
+# instant the deciding input was sampled (button edge, accel read, tilt
+# onset, encoder detent), which RHYTHM mode judges against the beat.
+
+SENSOR_BUTTON = 1
+SENSOR_ENCODER = 2
+SENSOR_ACCEL = 4
+
+DETECTOR_REPORT_MS = 1000       # telemetry cadence of the cost records
+
+DETECTORS = {}                  # action -> detectors, in the order they run
+DETECTOR_LIST = []              # every detector, index = telemetry id
+
+sampled = 0                     # sensors already read this frame
+sampled_frame = -1
+
+frame_detect_us = 0             # detector time in the last frame
+detector_report_ms = 0
+
+
+def register_detector(action, name, detect, sensors, sample_ms=0, cost_us=500, optional=False):
+    """
+    Add a detector for `action`.
+
+    detect(now) returns an action, a failure string or None. Optional
+    detectors (penalties, stats) are the first work dropped when a frame
+    runs late; required ones always run.
+    """
+    det = {
+        "id": len(DETECTOR_LIST),
+        "action": action,
+        "name": name,
+        "detect": detect,
+        "sensors": sensors,
+        "sample_ms": sample_ms,
+        "cost_us": cost_us,
+        "optional": optional,
+        "last_ms": 0,
+        "avg_us": cost_us,      # running estimate, seeded with the declared cost
+        "max_us": 0,
+        "runs": 0,
+        "skipped": 0,
+    }
+    DETECTORS.setdefault(action, []).append(det)
+    DETECTOR_LIST.append(det)
+    return det
+
+
+def sample_inputs(sensors):
+    """Read the inputs in `sensors` that this frame has not read yet."""
+    global sampled, sampled_frame
+    if sampled_frame != inp.frame_id:
+        sampled_frame = inp.frame_id
+        sampled = 0
+    todo = sensors & ~sampled
+    sampled |= todo
+    if todo & SENSOR_ENCODER:
+        inp.update_encoder()
+    if todo & SENSOR_BUTTON:
+        inp.update_button()
+    if todo & SENSOR_ACCEL:
+        inp.accel_snapshot()
+
+
+def poll_inputs():
+    """Every PLAYING frame, ignore windows and the HEAT OK pause included."""
+    sample_inputs(SENSOR_ENCODER)
+
+
+def run_detectors(expected_action, now):
+    """Run the detectors the current step needs; first non-None result wins."""
+    global frame_detect_us
+
+    detectors = DETECTORS[expected_action]
+    t_start = time.monotonic_ns()
+    result = None
+
+    for det in detectors:
+        if now - det["last_ms"] < det["sample_ms"]:
+            continue
+
+        if det["optional"]:
+            spent_us = (time.monotonic_ns() - inp.frame_start_ns) // 1000
+            if spent_us + det["avg_us"] > qos.FRAME_DEADLINE_US:
+                det["skipped"] += 1
+                continue
+
+        t0 = time.monotonic_ns()
+        sample_inputs(det["sensors"])       # counted in the detector's cost
+        result = det["detect"](now)
+        cost_us = (time.monotonic_ns() - t0) // 1000
+
+        det["last_ms"] = now
+        det["runs"] += 1
+        det["avg_us"] += (cost_us - det["avg_us"]) >> 3
+        if cost_us > det["max_us"]:
+            det["max_us"] = cost_us
+
+        if result is not None:
+            break
+
+    frame_detect_us = (time.monotonic_ns() - t_start) // 1000
+    return result
+
+
+def reset_detectors():
+    """Called when a new step starts, so sample_ms gating starts fresh."""
+    for det in DETECTOR_LIST:
+        det["last_ms"] = 0
+
+
+def report_detectors(expected_action, now):
+    """Queue one cost record per active detector every DETECTOR_REPORT_MS."""
+    global detector_report_ms
+    if now - detector_report_ms < DETECTOR_REPORT_MS:
+        return
+    detector_report_ms = now
+    for det in DETECTORS[expected_action]:
+        tel.record_detector(det, frame_detect_us)
+
+
+def get_player_action(expected_action):
+    """Read player input according to the expected action for this step."""
+    return run_detectors(expected_action, hw.now_ms())
+
+
+def accel_delta():
+    """Change of this frame's magnitude since the last call (shared baseline)."""
+    global last_mag
+    if last_mag == 0:
+        last_mag = inp.snap_mag     # first sample of the step only seeds the baseline
+        return 0
+    delta = abs(inp.snap_mag - last_mag)
+    last_mag = inp.snap_mag
+    tel.samples += 1
+    if delta > tel.peak_delta:
+        tel.peak_delta = delta
+    return delta
+
+
+def reset_baseline():
+    """
+    Forget the shake baseline (new step). The snapshot of the frame that
+    cleared the last step may be the move itself (a MIX spike), so the
+    first sample a detector takes in the new step seeds it instead.
+    """
+    global last_mag
+    last_mag = 0
+
+
+# --------------------- ADD ---------------------
+
+def detect_add(now):
+    """Button press is a correct ADD."""
+    global last_action_ms, input_event_ns
+    if inp.btn_pressed:
+        last_action_ms = now
+        input_event_ns = inp.btn_press_ns    # scanned edge, not this poll
+        return ACTION_ADD
+    return None
+
+
+def detect_wrong_shake(now):
+    """All modes but Easy: a strong shake during ADD is WRONG_SHAKE."""
+    global last_action_ms
+    if st.difficulty == DIFFICULTY_EASY:
+        return None
+
+    # ignore right after step change
+    if now - st.move_start_ms < 600:
+        return None
+
+    if accel_delta() > wrong_shake_threshold_raw:
+        last_action_ms = now
+        return "WRONG_SHAKE"
+    return None
+
+
+# --------------------- HEAT ---------------------
+
+def detect_heat(now):
+    """Use encoder to reach LOW/MID/HIGH and hold the target level."""
+    global last_action_ms, input_event_ns
+
+    if now - last_action_ms < ACTION_LOCK_MS:
+        return None
+
+    delta = inp.enc_pos - st.heat_start_pos
+
+    # encoder → heat level mapping
+    if not st.heat_moved:
+        if abs(delta) < HEAT_TICKS_REQUIRED:
+            st.heat_level = HEAT_NONE
+        elif delta < 0:
+            st.heat_level = HEAT_LOW
+            st.heat_moved = True
+        else:
+            st.heat_level = HEAT_HIGH
+            st.heat_moved = True
+    else:
+        if delta <= -HEAT_TICKS_REQUIRED:
+            st.heat_level = HEAT_LOW
+        elif delta >= HEAT_TICKS_REQUIRED:
+            st.heat_level = HEAT_HIGH
+        else:
+            st.heat_level = HEAT_MID
+
+    # update LED by heat level
+    render.set_heat_led(st.heat_level)
+
+    # redraw the NOW: line when it is out of date (throttled; the first
+    # redraw to go when frames run late, caught up once they are healthy)
+    if (st.heat_level != st.heat_shown_level
+            and now - st.heat_last_draw_ms > HEAT_DRAW_THROTTLE_MS
+            and qos.allow(qos.SHED_REDRAW)):
+        st.heat_last_draw_ms = now
+        st.heat_shown_level = st.heat_level
+        now_txt = "--" if st.heat_level == HEAT_NONE else HEAT_NAMES[st.heat_level]
+        render.set_heat_lines(f"SET HEAT: {HEAT_NAMES[st.heat_target]}", f"NOW: {now_txt}")
+
+    hold_ms = HEAT_HOLD_MS
+    if st.difficulty == DIFFICULTY_RHYTHM:
+        hold_ms = RHYTHM_HEAT_HOLD_MS
+
+    # check if target level is reached and held
+    if st.heat_level == st.heat_target and st.heat_level != HEAT_NONE:
+        if not st.heat_holding:
+            st.heat_holding = True
+            st.heat_hold_start_ms = now
+            st.heat_hold_start_ns = inp.enc_change_ns    # the detent that reached the target
+            st.heat_shown_level = st.heat_level
+            render.set_heat_lines("HOLD HEAT...", f"NOW: {HEAT_NAMES[st.heat_level]}")
+        else:
+            if now - st.heat_hold_start_ms >= hold_ms:
+                # RHYTHM keeps moving on the beat, no lingering HEAT OK screen
+                st.heat_just_cleared = st.difficulty != DIFFICULTY_RHYTHM
+                st.heat_clear_ms = now
+                render.set_heat_lines("HEAT OK!", f"{HEAT_NAMES[st.heat_level]} matched")
+                last_action_ms = now
+                input_event_ns = st.heat_hold_start_ns
+                st.heat_holding = False
+                return ACTION_HEAT
+    else:
+        st.heat_holding = False
+
+    # timeout for HEAT if player never reaches target
+    if now - st.move_start_ms > HEAT_TIMEOUT_MS:
+        return "TIMEOUT_HEAT"
+
+    return None
+
+
+# --------------------- MIX ---------------------
+
+def detect_mix(now):
+    """Multiple strong shakes within a time window."""
+    global mix_spike_count, last_mix_spike_ms, last_shake_ms, last_action_ms
+    global tilt_hold_active, tilt_hold_start_ms, input_event_ns
+
+    if now - last_action_ms < ACTION_LOCK_MS:
+        return None
+
+    # need multiple strong spikes in a short time
+    if accel_delta() > mix_threshold_raw:
+        if now - last_mix_spike_ms < mix_spike_window_ms:
+            mix_spike_count += 1
+        else:
+            mix_spike_count = 1
+        last_mix_spike_ms = now
+
+        if mix_spike_count >= 2 and (now - last_shake_ms > COOLDOWN_MS):
+            mix_spike_count = 0
+            last_shake_ms = now
+            last_action_ms = now
+            tilt_hold_active = False
+            tilt_hold_start_ms = 0
+            input_event_ns = inp.snap_ns
+            return ACTION_MIX
+    return None
+
+
+# --------------------- TILT ---------------------
+
+def detect_tilt(now):
+    """Tilt and hold for a short period."""
+    global tilt_hold_active, tilt_hold_start_ms, tilt_hold_start_ns
+    global last_tilt_ms, last_action_ms, input_event_ns
+
+    if now - last_action_ms < ACTION_LOCK_MS:
+        return None
+
+    accel_delta()   # keeps the shake baseline fresh for the next step
+
+    if abs(inp.snap_x - tilt_offset_x) > tilt_threshold_raw:
+        if not tilt_hold_active:
+            tilt_hold_active = True
+            tilt_hold_start_ms = now
+            tilt_hold_start_ns = inp.snap_ns     # the pour starts here, not when the hold completes
+        else:
+            if (now - tilt_hold_start_ms > 400) and (now - last_tilt_ms > COOLDOWN_MS):
+                last_tilt_ms = now
+                last_action_ms = now
+                input_event_ns = tilt_hold_start_ns
+                tilt_hold_active = False
+                tilt_hold_start_ms = 0
+                return ACTION_TILT
+    else:
+        tilt_hold_active = False
+        tilt_hold_start_ms = 0
+    return None
+
+
+# --------------------- STIR ---------------------
+
+STIR_TICKS = 6          # detents in one direction
+STIR_GAP_MS = 400       # longest pause between detents that still counts
+
+stir_last_pos = 0
+stir_dir = 0
+stir_count = 0
+stir_last_tick_ms = 0
+stir_start_ns = 0
+
+
+def detect_stir(now):
+    """Keep turning the encoder the same way without stopping."""
+    global stir_last_pos, stir_dir, stir_count, stir_last_tick_ms, stir_start_ns
+    global last_action_ms, input_event_ns
+
+    if now - last_action_ms < ACTION_LOCK_MS:
+        stir_last_pos = inp.enc_pos
+        return None
+
+    moved = inp.enc_pos - stir_last_pos
+    stir_last_pos = inp.enc_pos
+
+    if moved == 0:
+        if stir_count and now - stir_last_tick_ms > STIR_GAP_MS:
+            stir_count = 0      # stopped stirring
+        return None
+
+    direction = 1 if moved > 0 else -1
+    if direction != stir_dir or now - stir_last_tick_ms > STIR_GAP_MS:
+        stir_dir = direction
+        stir_count = 0
+        stir_start_ns = inp.enc_change_ns
+    stir_count += abs(moved)
+    stir_last_tick_ms = now
+
+    if stir_count >= STIR_TICKS:
+        stir_count = 0
+        last_action_ms = now
+        input_event_ns = stir_start_ns
+        return ACTION_STIR
+    return None
+
+
+# --------------------- FLIP ---------------------
+
+FLIP_Z_RAW = int(6.0 / inp.ACCEL_MS2_PER_LSB)     # |z| well past the horizon
+FLIP_HOLD_MS = 150
+
+flip_from = 0           # z sign the step started with (0 = not yet known)
+flip_start_ms = 0
+flip_start_ns = 0
+
+
+def detect_flip(now):
+    """Turn the device over: z settles on the opposite sign."""
+    global flip_from, flip_start_ms, flip_start_ns, last_action_ms, input_event_ns
+
+    if now - last_action_ms < ACTION_LOCK_MS:
+        return None
+
+    accel_delta()   # keeps the shake baseline fresh for the next step
+
+    if inp.snap_z > FLIP_Z_RAW:
+        side = 1
+    elif inp.snap_z < -FLIP_Z_RAW:
+        side = -1
+    else:
+        flip_start_ms = 0
+        return None
+
+    if flip_from == 0:
+        flip_from = side
+        return None
+
+    if side == flip_from:
+        flip_start_ms = 0
+        return None
+
+    if flip_start_ms == 0:
+        flip_start_ms = now
+        flip_start_ns = inp.snap_ns
+    elif now - flip_start_ms >= FLIP_HOLD_MS:
+        flip_from = side        # the next FLIP goes back the other way
+        flip_start_ms = 0
+        last_action_ms = now
+        input_event_ns = flip_start_ns
+        return ACTION_FLIP
+    return None
+
+
+def reset_gestures():
+    """Forget half-finished gestures and queued presses when a step starts."""
+    global stir_last_pos, stir_count, stir_dir, flip_from, flip_start_ms
+    global tilt_hold_active, tilt_hold_start_ms
+    stir_last_pos = inp.enc_pos
+    stir_count = 0
+    stir_dir = 0
+    flip_from = 0
+    flip_start_ms = 0
+    tilt_hold_active = False
+    tilt_hold_start_ms = 0
+    reset_baseline()
+    inp.clear_button()
+
+
+def hold_onset_ns(action):
+    """Sample instant a TILT / HEAT hold still in progress started at, 0 if none."""
+    if action == ACTION_TILT and tilt_hold_active:
+        return tilt_hold_start_ns
+    if action == ACTION_HEAT and st.heat_holding:
+        return st.heat_hold_start_ns
+    return 0
+
+
+register_detector(ACTION_ADD, "ADD", detect_add, SENSOR_BUTTON, cost_us=100)
+register_detector(ACTION_ADD, "WRONG_SHAKE", detect_wrong_shake, SENSOR_ACCEL,
+                  sample_ms=10, cost_us=1500, optional=True)
+register_detector(ACTION_HEAT, "HEAT", detect_heat, SENSOR_ENCODER, cost_us=500)
+register_detector(ACTION_MIX, "MIX", detect_mix, SENSOR_ACCEL, sample_ms=10, cost_us=1500)
+register_detector(ACTION_TILT, "TILT", detect_tilt, SENSOR_ACCEL, sample_ms=10, cost_us=1500)
+register_detector(ACTION_STIR, "STIR", detect_stir, SENSOR_ENCODER, cost_us=100)
+register_detector(ACTION_FLIP, "FLIP", detect_flip, SENSOR_ACCEL, sample_ms=20, cost_us=1500)
+
@@ -0,0 +1,69 @@
+"""
+Board setup: I2C bus, OLED, accelerometer, encoder, button and NeoPixel.
+
+Every device is created once, at import. The other modules only use the
+objects defined here.
+"""
+
+import time
+import board
+import digitalio
+import keypad
+from adafruit_debouncer import Debouncer
+import displayio
+from i2cdisplaybus import I2CDisplayBus
+import adafruit_displayio_ssd1306
+import adafruit_adxl34x
+from adafruit_bus_device.i2c_device import I2CDevice
+import neopixel
+
+
+# ===================== Common setup (OLED + I2C + Accelerometer) =====================
+
+displayio.release_displays()
+i2c = board.I2C()
+
+display_bus = I2CDisplayBus(i2c, device_address=0x3C)
+oled = adafruit_displayio_ssd1306.SSD1306(display_bus, width=128, height=64)
+
+accel = adafruit_adxl34x.ADXL345(i2c)   # powers the sensor up; reads go through the snapshot
+
+ADXL345_ADDRESS = 0x53
+accel_dev = I2CDevice(i2c, ADXL345_ADDRESS)
+
+
+# ===================== Rotary Encoder =====================
+
+enc_a = digitalio.DigitalInOut(board.D1)
+enc_a.direction = digitalio.Direction.INPUT
+enc_a.pull = digitalio.Pull.UP
+
+enc_b = digitalio.DigitalInOut(board.D2)
+enc_b.direction = digitalio.Direction.INPUT
+enc_b.pull = digitalio.Pull.UP
+
+enc_a_db = Debouncer(enc_a, interval=0.002)
+enc_b_db = Debouncer(enc_b, interval=0.002)
+
+
+# ===================== Button =====================
+#
+# Scanned by keypad.Keys in the background: every press and release is
+# queued with the time it was scanned, however late the loop reads it
+# (see input.update_button()).
+
+btn_keys = keypad.Keys((board.D9,), value_when_pressed=False, pull=True, interval=0.005)
+btn_event = keypad.Event()      # reused for every queued event, no allocation
+
+
+# ===================== NeoPixel =====================
+
+PIXEL_PIN = board.D0          # external NeoPixel pin
+NUM_PIXELS = 1
+pixels = neopixel.NeoPixel(PIXEL_PIN, NUM_PIXELS, brightness=0.3, auto_write=False)
+
+
+# ===================== Utility =====================
+
+def now_ms():
+    return time.monotonic_ns() // 1_000_000
@@ -0,0 +1,167 @@
+"""
+Per-frame input: encoder position, button state and the accelerometer
+snapshot every consumer shares.
+"""
+
+import time
+import supervisor
+
+from cooking import hardware as hw
+
+
+# ===================== Rotary Encoder =====================
+
+enc_pos = 0
+enc_change_ns = 0       # sample instant of the last detent
+
+
+def update_encoder():
+    """Update encoder debouncers and track a simple position counter."""
+    global enc_pos, enc_change_ns
+    hw.enc_a_db.update()
+    hw.enc_b_db.update()
+
+    if hw.enc_a_db.fell:
+        enc_change_ns = time.monotonic_ns()
+        if hw.enc_b_db.value:
+            enc_pos += 1   # clockwise
+        else:
+            enc_pos -= 1   # counter-clockwise
+
+
+# ===================== Button =====================
+#
+# hw.btn_keys timestamps every edge with supervisor.ticks_ms().
+# update_button() drains the queue and moves the press time onto the
+# time.monotonic_ns() base everything else uses, so ADD is judged by when
+# the button went down, not by when the loop got around to looking.
+
+TICKS_MASK = (1 << 29) - 1      # supervisor.ticks_ms() wraps at 2**29
+BTN_BOUNCE_MS = 30              # a press this soon after the last one is contact bounce
+
+btn_down = False                # held right now
+btn_pressed = False             # went down since the previous update_button()
+btn_press_ns = 0                # when it went down
+btn_press_ticks = 0
+
+
+def update_button():
+    """Drain the button's queued edges; True if it was pressed since the last call."""
+    global btn_down, btn_pressed, btn_press_ns, btn_press_ticks
+    btn_pressed = False
+    while hw.btn_keys.events.get_into(hw.btn_event):
+        btn_down = hw.btn_event.pressed
+        if not btn_down:
+            continue
+        ticks = hw.btn_event.timestamp
+        if btn_press_ns and (ticks - btn_press_ticks) & TICKS_MASK < BTN_BOUNCE_MS:
+            continue
+        btn_press_ticks = ticks
+        age_ms = (supervisor.ticks_ms() - ticks) & TICKS_MASK
+        btn_press_ns = time.monotonic_ns() - age_ms * 1_000_000
+        btn_pressed = True
+    return btn_pressed
+
+
+def clear_button():
+    """Drop presses queued while nothing was listening (new step, game over)."""
+    global btn_pressed
+    hw.btn_keys.events.clear()
+    btn_pressed = False
+
+
+def wait_release():
+    """Block until the button is let go (menu, game over)."""
+    while btn_down:
+        time.sleep(0.05)
+        update_button()
+
+
+# ===================== Accelerometer snapshot =====================
+#
+# The ADXL345 data registers are read once per frame into a reusable
+# buffer. Every consumer (WRONG_SHAKE, MIX, TILT, baseline reset, telemetry)
+# shares the same raw int16 axes and integer magnitude, so there is one
+# I2C transaction and no float tuple per frame. Convert with
+# snapshot_ms2() only for display or debugging.
+
+ADXL345_REG_DATAX0 = 0x32
+ACCEL_MS2_PER_LSB = 0.004 * 9.80665     # same scale adafruit_adxl34x uses (+-2 g)
+
+snap_reg = bytes([ADXL345_REG_DATAX0])
+snap_buf = bytearray(6)
+
+snap_x = 0              # raw counts
+snap_y = 0
+snap_z = 0
+snap_mag2 = 0           # x*x + y*y + z*z
+snap_mag = 0            # integer sqrt of snap_mag2
+snap_ns = 0             # sample instant
+snap_frame = -1
+
+frame_id = 0            # bumped once per main-loop iteration
+frame_start_ns = 0      # start of the current frame (detector budget)
+
+
+def begin_frame():
+    """Called first thing in every main-loop iteration."""
+    global frame_id, frame_start_ns
+    frame_id += 1
+    frame_start_ns = time.monotonic_ns()
+
+
+def isqrt_near(n, guess):
+    """
+    Exact integer square root by Newton's method.
+
+    Seeded with last frame's magnitude, which is almost always within a
+    few counts, so this usually settles in one or two integer divisions.
+    """
+    if n <= 0:
+        return 0
+    if guess <= 0:
+        guess = 256     # ~1 g
+    x = (guess + n // guess) >> 1     # now x >= isqrt(n)
+    y = (x + n // x) >> 1
+    while y < x:
+        x = y
+        y = (x + n // x) >> 1
+    return x
+
+
+def accel_snapshot():
+    """Read the accelerometer unless this frame already did."""
+    global snap_x, snap_y, snap_z, snap_mag2, snap_mag, snap_ns, snap_frame
+
+    if snap_frame == frame_id:
+        return
+    snap_frame = frame_id
+
+    with hw.accel_dev:
+        hw.accel_dev.write_then_readinto(snap_reg, snap_buf)
+    snap_ns = time.monotonic_ns()
+
+    x = snap_buf[0] | (snap_buf[1] << 8)
+    if x & 0x8000:
+        x -= 0x10000
+    y = snap_buf[2] | (snap_buf[3] << 8)
+    if y & 0x8000:
+        y -= 0x10000
+    z = snap_buf[4] | (snap_buf[5] << 8)
+    if z & 0x8000:
+        z -= 0x10000
+
+    snap_x = x
+    snap_y = y
+    snap_z = z
+    snap_mag2 = x * x + y * y + z * z
+    snap_mag = isqrt_near(snap_mag2, snap_mag)
+
+
+def snapshot_ms2():
+    """Current snapshot in m/s^2 (allocates; debugging/display only)."""
+    return (
+        snap_x * ACCEL_MS2_PER_LSB,
+        snap_y * ACCEL_MS2_PER_LSB,
+        snap_z * ACCEL_MS2_PER_LSB,
+    )
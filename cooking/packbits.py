@@ -0,0 +1,39 @@
+"""
+PackBits encoder for screen capture frames.
+
+A 1-bpp screen is mostly long runs of 0x00 or 0xFF, which collapse to two
+bytes per 128; incompressible data costs one extra byte per 128 (RLE_MAX).
+"""
+
+RAW_SIZE = 128 * 64 // 8                # one 1-bpp OLED frame
+RLE_MAX = RAW_SIZE + RAW_SIZE // 128    # PackBits worst case
+
+
+def packbits(src, dst):
+    """PackBits-encode `src` into `dst`; returns the encoded length."""
+    n = len(src)
+    i = 0
+    o = 0
+    while i < n:
+        v = src[i]
+        j = i + 1
+        while j < n and j - i < 128 and src[j] == v:
+            j += 1
+        if j - i > 2:
+            dst[o] = 257 - (j - i)          # repeat run
+            dst[o + 1] = v
+            o += 2
+            i = j
+            continue
+
+        start = i
+        i += 1
+        # runs shorter than 3 stay in the literal, so output never grows past +1/128
+        while i < n and i - start < 128 and not (
+                i + 2 < n and src[i] == src[i + 1] == src[i + 2]):
+            i += 1
+        count = i - start
+        dst[o] = count - 1                  # literal run
+        dst[o + 1:o + 1 + count] = src[start:i]
+        o += 1 + count
+    return o
@@ -0,0 +1,142 @@
+"""
+Frame-deadline monitor: drops optional work while frames run late.
+"""
+
+import struct
+import time
+
+from cooking import hardware as hw
+from cooking import input as inp
+from cooking import telemetry as tel
+
+
+# ===================== Frame deadline / quality of service =====================
+#
+# Every PLAYING frame is timed from inp.begin_frame() to the loop's sleep.
+# Repeated overruns raise the shed level one step at a time; each level
+# drops one more kind of optional work, in this order:
+#   1. LED animation (RHYTHM beat cues on the NeoPixel)
+#   2. non-critical redraws (the HEAT "NOW:" line)
+#   3. HUD updates (the countdown bar)
+# After a run of healthy frames the level goes back down one step, so the
+# last work shed is the first restored. Gesture sampling itself is never
+# shed: keeping it on time is the point. Optional detectors are dropped
+# per frame against the same deadline (cooking.gestures.run_detectors()).
+# Frames doing planned or debug work (a step prefetch, a checkpoint write,
+# a screen capture for the host) are exempted instead of judged, so a
+# debug feature never degrades the game.
+
+FRAME_DEADLINE_US = 15000       # the frame budget: work per frame, not counting the 10 ms sleep
+SHED_STRIKES = 2                # overruns (close together) before shedding more
+STRIKE_RESET_FRAMES = 8         # healthy frames that forget a lone overrun
+RESTORE_FRAMES = 60             # healthy frames before restoring one level
+QOS_REPORT_MS = 1000
+
+SHED_LED = 1                    # shed level at which each kind of work stops
+SHED_REDRAW = 2
+SHED_HUD = 3
+
+# sync, type, len, t_ms, level, frames, overruns, worst frame since the
+# last record (us), level raises, restores, shed LED / REDRAW / HUD
+# (counters wrap at 16 bits)
+QOS_FMT = "<BBHIBHHHHHHHH"
+QOS_SIZE = struct.calcsize(QOS_FMT)
+
+level = 0
+strikes = 0
+healthy = 0
+exempt = False                  # this frame does planned heavy work
+
+frames = 0
+overruns = 0
+worst_us = 0                    # since the last report
+raises = 0                      # times the level went up
+restores = 0                    # times it came back down
+shed = [0, 0, 0]                # skipped work items per kind (LED, REDRAW, HUD)
+report_ms = 0
+
+
+def allow(kind):
+    """False while work of `kind` is being shed; every refusal is counted."""
+    if level < kind:
+        return True
+    shed[kind - 1] += 1
+    return False
+
+
+def exempt_frame():
+    """Don't judge this frame: it does planned or debug work (prefetch, capture)."""
+    global exempt
+    exempt = True
+
+
+def end_frame():
+    """Main loop, just before the sleep: check the frame against the deadline."""
+    global level, strikes, healthy, exempt, frames, overruns, worst_us, raises, restores
+
+    if exempt:
+        exempt = False
+        return
+
+    used_us = (time.monotonic_ns() - inp.frame_start_ns) // 1000
+    frames += 1
+    if used_us > worst_us:
+        worst_us = used_us
+
+    if used_us > FRAME_DEADLINE_US:
+        overruns += 1
+        healthy = 0
+        strikes += 1
+        if strikes >= SHED_STRIKES:
+            strikes = 0
+            if level < SHED_HUD:
+                level += 1
+                raises += 1
+        return
+
+    healthy += 1
+    if healthy == STRIKE_RESET_FRAMES:
+        strikes = 0
+    if healthy >= RESTORE_FRAMES and level > 0:
+        level -= 1
+        restores += 1
+        healthy = 0
+
+
+def reset():
+    """New game: start with everything enabled (counters keep running)."""
+    global level, strikes, healthy, exempt
+    level = 0
+    strikes = 0
+    healthy = 0
+    exempt = False          # an exemption from the last game's final frame
+
+
+def report(now):
+    """Queue a QoS record every QOS_REPORT_MS (no-op without a host)."""
+    global report_ms, worst_us
+    if now - report_ms < QOS_REPORT_MS:
+        return
+    report_ms = now
+    if not tel.active():
+        return
+
+    offset = tel.reserve(QOS_SIZE)
+    if offset < 0:
+        return
+
+    struct.pack_into(
+        QOS_FMT, tel.buf, offset,
+        tel.SYNC, tel.TYPE_QOS, QOS_SIZE - 4,
+        hw.now_ms() & 0xFFFFFFFF,
+        level,
+        frames & 0xFFFF,
+        overruns & 0xFFFF,
+        min(worst_us, 0xFFFF),
+        raises & 0xFFFF,
+        restores & 0xFFFF,
+        shed[0] & 0xFFFF,
+        shed[1] & 0xFFFF,
+        shed[2] & 0xFFFF,
+    )
+    worst_us = 0
@@ -0,0 +1,436 @@
+"""
+Drawing: scenes, the HUD, NeoPixel effects and screen capture.
+"""
+
+import time
+import struct
+import displayio
+import bitmaptools
+import rainbowio
+import terminalio
+from adafruit_display_text import label
+
+from cooking import hardware as hw
+from cooking.state import HEAT_HIGH, HEAT_LOW, HEAT_MID, HEAT_NONE
+from cooking import telemetry as tel
+from cooking import qos
+from cooking.packbits import RLE_MAX, packbits
+
+
+# ===================== NeoPixel =====================
+
+def pixels_off():
+    hw.pixels.fill((0, 0, 0))
+    hw.pixels.show()
+
+
+def set_led(color):
+    """Write the NeoPixel only if it is not already showing `color`."""
+    if hw.pixels[0] != color:
+        hw.pixels.fill(color)
+        hw.pixels.show()
+
+
+def set_heat_led(level):
+    """Map HEAT level to NeoPixel color (no write if it is already showing)."""
+    if level == HEAT_NONE:
+        set_led((0, 0, 0))          # off
+    elif level == HEAT_LOW:
+        set_led((0, 0, 255))        # blue (low heat)
+    elif level == HEAT_MID:
+        set_led((255, 180, 0))      # orange (medium)
+    elif level == HEAT_HIGH:
+        set_led((179, 46, 46))      # red (high)
+
+
+def rainbow_spin(duration_ms=1200, step_ms=20):
+    """Short rainbow spin effect for win screen."""
+    start = hw.now_ms()
+    hue = 0
+    while hw.now_ms() - start < duration_ms:
+        c = rainbowio.colorwheel(hue & 255)
+        hw.pixels.fill(c)
+        hw.pixels.show()
+        hue += 5
+        time.sleep(step_ms / 1000)
+
+
+def flash_color(color, duration_ms=600):
+    """Flash a single color for a moment."""
+    hw.pixels.fill(color)
+    hw.pixels.show()
+    time.sleep(duration_ms / 1000)
+    pixels_off()
+
+
+# ===================== Scenes =====================
+
+root = displayio.Group()        # group currently shown on the OLED
+hw.oled.root_group = root
+
+
+def show_scene(group, hud=False):
+    """Put an already built group on the OLED; with hud=True the HUD goes on top."""
+    global root, capture_dirty
+    hud_detach()
+    root = group
+    hw.oled.root_group = root
+    capture_dirty = True
+    if hud:
+        hud_attach()
+    return root
+
+
+def new_scene():
+    """Replace what the OLED shows with a new, empty group and return it."""
+    return show_scene(displayio.Group())
+
+
+def build_scene(lines, hud=False):
+    """
+    Build (but do not show) a group with up to 4 lines of centered text
+    using the default terminal font.
+
+    With hud=True the top row and the bottom pixel row belong to the HUD,
+    so only 3 text lines are drawn, starting lower.
+    """
+    group = displayio.Group()
+
+    # clear background
+    bg_bitmap = displayio.Bitmap(128, 64, 1)
+    bg_palette = displayio.Palette(1)
+    bg_palette[0] = 0x000000
+    bg_tile = displayio.TileGrid(bg_bitmap, pixel_shader=bg_palette, x=0, y=0)
+    group.append(bg_tile)
+
+    y = 12
+    max_lines = 4
+    if hud:
+        y = 24
+        max_lines = 3
+
+    for t in lines[:max_lines]:
+        text = str(t)
+
+        # approximate width assuming ~6 px per character
+        text_width = len(text) * 6
+        x = (128 - text_width) // 2
+        if x < 0:
+            x = 0  # if too long, left-align
+
+        lbl = label.Label(terminalio.FONT, text=text, color=0xFFFFFF, x=x, y=y)
+        group.append(lbl)
+        y += 14
+
+    return group
+
+
+def draw_screen(lines, hud=False):
+    """Clear the OLED and draw up to 4 lines of centered text (see build_scene())."""
+    show_scene(build_scene(lines, hud), hud)
+
+
+def add_line(group, line, text="", hud=True):
+    """
+    Append a text line that changes later (see set_line()) to a scene.
+
+    Anchored at its center, so it stays centered whatever its length.
+    `line` counts like the lines of build_scene().
+    """
+    lbl = label.Label(terminalio.FONT, text=text, color=0xFFFFFF)
+    lbl.anchor_point = (0.5, 0.5)
+    lbl.anchored_position = (64, (24 if hud else 12) + line * 14)
+    group.append(lbl)
+    return lbl
+
+
+def set_line(lbl, text):
+    """Change one line in place; only the label's own area is redrawn."""
+    global capture_dirty
+    if lbl is None or lbl.text == text:
+        return
+    lbl.text = text
+    capture_dirty = True
+
+
+# ===================== HEAT lines =====================
+#
+# The HEAT step scene keeps its status line ("SET HEAT: MID", "HOLD
+# HEAT...", "HEAT OK!") and its NOW: line as labels. Level changes only
+# set their text, the scene itself is never rebuilt during the step.
+
+heat_status_label = None
+heat_now_label = None
+
+
+def set_heat_lines(status, now_text):
+    set_line(heat_status_label, status)
+    set_line(heat_now_label, now_text)
+
+
+# ===================== HUD (countdown bar, step, score) =====================
+#
+# The bar and the beat dot are built once and moved between scenes, so
+# gameplay never reallocates them. The countdown bar is a 1 pixel high
+# bitmap row: each update only touches the columns that changed, which
+# keeps the dirty area (and I2C traffic) to a sliver of the screen.
+#
+# The step and score texts change exactly at a step change, so they are
+# not shared labels: each step scene gets its own (add_hud_step(),
+# add_hud_score()), built ahead of time by screens.prefetch_step().
+
+HUD_BAR_Y = 63
+HUD_BAR_W = 128
+HUD_TEXT_Y = 5
+HUD_UPDATE_MS = 40          # at most ~25 bar updates per second
+
+hud_group = displayio.Group()
+hud_parent = None           # scene group the HUD is currently attached to
+
+hud_bar_bitmap = displayio.Bitmap(HUD_BAR_W, 1, 2)
+hud_bar_palette = displayio.Palette(2)
+hud_bar_palette[0] = 0x000000
+hud_bar_palette[1] = 0xFFFFFF
+hud_group.append(
+    displayio.TileGrid(hud_bar_bitmap, pixel_shader=hud_bar_palette, x=0, y=HUD_BAR_Y)
+)
+
+# beat cue for RHYTHM mode: a small square that is only ever shown/hidden
+hud_dot_bitmap = displayio.Bitmap(5, 5, 1)
+hud_dot_palette = displayio.Palette(1)
+hud_dot_palette[0] = 0xFFFFFF
+hud_beat_dot = displayio.TileGrid(hud_dot_bitmap, pixel_shader=hud_dot_palette, x=80, y=2)
+hud_beat_dot.hidden = True
+hud_group.append(hud_beat_dot)
+
+hud_bar_cols = 0            # columns currently lit
+hud_last_update_ms = 0
+
+
+def hud_attach():
+    """Put the HUD on top of the current scene."""
+    global hud_parent
+    hud_detach()
+    root.append(hud_group)
+    hud_parent = root
+
+
+def hud_detach():
+    global hud_parent
+    if hud_parent is not None:
+        hud_parent.remove(hud_group)
+        hud_parent = None
+
+
+def hud_set_bar(cols):
+    """Light exactly `cols` columns, writing only the ones that differ."""
+    global hud_bar_cols, capture_dirty
+    cols = max(0, min(HUD_BAR_W, cols))
+    if cols == hud_bar_cols:
+        return
+    capture_dirty = True
+
+    if cols == HUD_BAR_W:
+        hud_bar_bitmap.fill(1)
+    elif cols < hud_bar_cols:
+        for x in range(cols, hud_bar_cols):
+            hud_bar_bitmap[x, 0] = 0
+    else:
+        for x in range(hud_bar_cols, cols):
+            hud_bar_bitmap[x, 0] = 1
+    hud_bar_cols = cols
+
+
+def hud_reset_bar():
+    """Refill the bar for a new step."""
+    global hud_last_update_ms
+    hud_set_bar(HUD_BAR_W)
+    hud_last_update_ms = hw.now_ms()
+
+
+def hud_update_bar(elapsed_ms, limit_ms, now):
+    """Shrink the countdown bar; throttled to HUD_UPDATE_MS, shed by qos."""
+    global hud_last_update_ms
+    if now - hud_last_update_ms < HUD_UPDATE_MS:
+        return
+    if not qos.allow(qos.SHED_HUD):
+        return
+    hud_last_update_ms = now
+
+    remaining = limit_ms - elapsed_ms
+    if remaining < 0:
+        remaining = 0
+    hud_set_bar(remaining * HUD_BAR_W // limit_ms)
+
+
+def add_hud_step(group, step_num, total):
+    """Append the top-left step counter to a scene being built."""
+    group.append(label.Label(terminalio.FONT, text=f"STEP {step_num}/{total}",
+                             color=0xFFFFFF, x=0, y=HUD_TEXT_Y))
+
+
+def add_hud_score(group, value):
+    """Append the top-right score to a scene being built."""
+    lbl = label.Label(terminalio.FONT, text=str(value), color=0xFFFFFF)
+    lbl.anchor_point = (1.0, 0.5)           # right aligned
+    lbl.anchored_position = (127, HUD_TEXT_Y)
+    group.append(lbl)
+
+
+def hud_set_beat_dot(visible):
+    """Show or hide the RHYTHM beat cue."""
+    global capture_dirty
+    if hud_beat_dot.hidden != visible:
+        return
+    hud_beat_dot.hidden = not visible
+    capture_dirty = True
+
+
+# ===================== Screen capture (USB CDC) =====================
+#
+# The SSD1306 driver has no framebuffer read-back, so the current scene is
+# composed into one preallocated 1-bpp bitmap with native bitmaptools
+# calls, PackBits-encoded straight from its buffer (memoryview, no Python
+# copies; see cooking.packbits) and queued on the telemetry stream. Only
+# runs while a host is attached, only when something on screen changed,
+# and at most every CAPTURE_MIN_MS. tools/screen_viewer.py shows the
+# frames live and tools/capture_check.py checks the codec on a computer.
+
+CAPTURE_ENABLED = True
+CAPTURE_MIN_MS = 100
+
+# sync, type, len, frame number, compose_us, encode_us; PackBits data follows
+CAP_HEADER_FMT = "<BBHHHH"
+CAP_HEADER_SIZE = struct.calcsize(CAP_HEADER_FMT)
+
+cap_bitmap = displayio.Bitmap(128, 64, 2)
+cap_raw = memoryview(cap_bitmap)
+cap_rle = bytearray(RLE_MAX)      # PackBits worst case
+cap_rle_view = memoryview(cap_rle)
+
+capture_dirty = True
+capture_last_ms = 0
+capture_count = 0
+
+
+def capture_lit(palette, index):
+    """1 = lit, 0 = dark, -1 = transparent."""
+    if palette.is_transparent(index):
+        return -1
+    return 1 if palette[index] else 0
+
+
+def capture_tile(src, sx, sy, w, h, dx, dy, lit0, lit1):
+    """Copy one tile of `src` into the capture bitmap at (dx, dy), clipped."""
+    if dx < 0:
+        sx -= dx
+        w += dx
+        dx = 0
+    if dy < 0:
+        sy -= dy
+        h += dy
+        dy = 0
+    w = min(w, 128 - dx)
+    h = min(h, 64 - dy)
+    if w <= 0 or h <= 0:
+        return
+
+    if lit0 == -1 and lit1 == 1:
+        # label glyphs: copy the lit pixels, keep what is underneath
+        bitmaptools.blit(cap_bitmap, src, dx, dy, x1=sx, y1=sy, x2=sx + w, y2=sy + h,
+                         skip_source_index=0)
+    elif lit0 == 0 and lit1 == 1:
+        bitmaptools.blit(cap_bitmap, src, dx, dy, x1=sx, y1=sy, x2=sx + w, y2=sy + h)
+    else:
+        # rare cases (black text on the menu bar): map through the palette
+        for yy in range(h):
+            for xx in range(w):
+                v = lit1 if src[sx + xx, sy + yy] else lit0
+                if v >= 0:
+                    cap_bitmap[dx + xx, dy + yy] = v
+
+
+def capture_tilegrid(tg, ox, oy):
+    palette = tg.pixel_shader
+    x0 = ox + tg.x
+    y0 = oy + tg.y
+    tw = tg.tile_width
+    th = tg.tile_height
+
+    if len(palette) == 1:
+        # single-colour bitmap (backgrounds, bars, beat dot): a plain fill
+        lit = capture_lit(palette, 0)
+        if lit < 0:
+            return
+        x1 = max(0, x0)
+        y1 = max(0, y0)
+        x2 = min(128, x0 + tg.width * tw)
+        y2 = min(64, y0 + tg.height * th)
+        if x1 < x2 and y1 < y2:
+            bitmaptools.fill_region(cap_bitmap, x1, y1, x2, y2, lit)
+        return
+
+    src = tg.bitmap
+    lit0 = capture_lit(palette, 0)
+    lit1 = capture_lit(palette, 1)
+    per_row = src.width // tw
+    for ty in range(tg.height):
+        for tx in range(tg.width):
+            index = tg[tx, ty]
+            capture_tile(
+                src,
+                (index % per_row) * tw, (index // per_row) * th, tw, th,
+                x0 + tx * tw, y0 + ty * th,
+                lit0, lit1,
+            )
+
+
+def capture_group(group, ox, oy):
+    for layer in group:
+        if layer.hidden:
+            continue
+        if isinstance(layer, displayio.TileGrid):
+            capture_tilegrid(layer, ox, oy)
+        else:
+            capture_group(layer, ox + layer.x, oy + layer.y)
+
+
+def capture_frame():
+    """Capture and queue the current screen if it changed (main loop)."""
+    global capture_dirty, capture_last_ms, capture_count
+
+    if not (CAPTURE_ENABLED and capture_dirty):
+        return
+    if not tel.active():
+        return
+    now = hw.now_ms()
+    if now - capture_last_ms < CAPTURE_MIN_MS or tel.fill:
+        return      # frames are big: wait for the queue to drain first
+
+    qos.exempt_frame()      # debug work: must not push gameplay into shedding
+    t0 = time.monotonic_ns()
+    cap_bitmap.fill(0)
+    capture_group(hw.oled.root_group, 0, 0)
+    t1 = time.monotonic_ns()
+    size = packbits(cap_raw, cap_rle_view)
+    t2 = time.monotonic_ns()
+
+    offset = tel.reserve(CAP_HEADER_SIZE + size)
+    if offset < 0:
+        return
+
+    struct.pack_into(
+        CAP_HEADER_FMT, tel.buf, offset,
+        tel.SYNC, tel.TYPE_FRAME, CAP_HEADER_SIZE - 4 + size,
+        capture_count & 0xFFFF,
+        min((t1 - t0) // 1000, 0xFFFF),
+        min((t2 - t1) // 1000, 0xFFFF),
+    )
+    start = offset + CAP_HEADER_SIZE
+    tel.view[start:start + size] = cap_rle_view[:size]
+
+    capture_count += 1
+    capture_dirty = False
+    capture_last_ms = now
+
+
@@ -0,0 +1,69 @@
+"""
+Beat timing and judgment for RHYTHM mode.
+
+Inputs are judged by their offset from the beat in integer
+time.monotonic_ns() units: PERFECT within 40 ms, GOOD within 100 ms,
+otherwise MISS. Nothing here touches hardware; tools/rhythm_sim.py
+measures these windows against simulated players.
+"""
+
+NS_PER_MS = 1_000_000
+NS_PER_MINUTE = 60_000_000_000
+
+JUDGE_PERFECT = 0
+JUDGE_GOOD = 1
+JUDGE_MISS = 2
+JUDGE_NAMES = ["PERFECT", "GOOD", "MISS"]
+
+PERFECT_WINDOW_NS = 40 * NS_PER_MS
+GOOD_WINDOW_NS = 100 * NS_PER_MS
+
+
+def beat_time_ns(origin_ns, bpm, n):
+    """
+    Time of beat n.
+
+    Always computed from the beat index, never by adding a period to the
+    previous beat, so integer rounding can not accumulate into drift.
+    """
+    return origin_ns + n * NS_PER_MINUTE // bpm
+
+
+def beat_at_or_after(origin_ns, bpm, t_ns):
+    """Index of the first beat that is not earlier than t_ns."""
+    if t_ns <= origin_ns:
+        return 0
+    n = (t_ns - origin_ns) * bpm // NS_PER_MINUTE
+    if beat_time_ns(origin_ns, bpm, n) < t_ns:
+        n += 1
+    return n
+
+
+def too_early(offset_ns):
+    """An input this far before its beat is not an attempt at it (ignored)."""
+    return offset_ns < -GOOD_WINDOW_NS
+
+
+def step_missed(now_ns, target_ns, hold_onset_ns=0):
+    """
+    True once a step can no longer be hit.
+
+    That is when the GOOD window after the beat has passed, unless a held
+    action (TILT, HEAT) that started inside the window is still being held:
+    its onset is what gets judged, so the step stays open until the hold
+    completes or is let go.
+    """
+    if now_ns - target_ns <= GOOD_WINDOW_NS:
+        return False
+    return not (hold_onset_ns and abs(hold_onset_ns - target_ns) <= GOOD_WINDOW_NS)
+
+
+def judge(offset_ns):
+    """PERFECT / GOOD / MISS for an input offset from its beat."""
+    if offset_ns < 0:
+        offset_ns = -offset_ns
+    if offset_ns <= PERFECT_WINDOW_NS:
+        return JUDGE_PERFECT
+    if offset_ns <= GOOD_WINDOW_NS:
+        return JUDGE_GOOD
+    return JUDGE_MISS
@@ -0,0 +1,430 @@
+"""
+Full screens: splash, menu, step prompt, game over and win.
+"""
+
+import time
+import displayio
+import terminalio
+from adafruit_display_text import label
+from adafruit_bitmap_font import bitmap_font
+
+from cooking import hardware as hw
+from cooking import input as inp
+from cooking import state as st
+from cooking.state import (
+    ACTION_HEAT, DIFFICULTY_NAMES, DIFFICULTY_RHYTHM, HEAT_NAMES, HEAT_NONE,
+    RHYTHM_POINTS, STEP_POINTS,
+)
+from cooking.rhythm import JUDGE_NAMES
+from cooking import render
+from cooking import gestures
+from cooking import telemetry as tel
+from cooking import qos
+
+
+# ===== Retro font for splash title =====
+league_font = bitmap_font.load_font("/fonts/LeagueSpartan-Bold-16.bdf")
+
+
+def make_pot_sprite():
+    """
+    Simple 32x32 bitmap with a pot + lid.
+    Currently unused, but kept as a utility if needed.
+    """
+    pot_bitmap = displayio.Bitmap(32, 32, 2)
+    pot_palette = displayio.Palette(2)
+    pot_palette[0] = 0x000000  # background
+    pot_palette[1] = 0xFFFFFF  # pot color
+
+    # pot body (x: 4–27, y: 16–26)
+    for y in range(16, 27):
+        for x in range(4, 28):
+            pot_bitmap[x, y] = 1
+
+    # top rim
+    for x in range(4, 28):
+        pot_bitmap[x, 15] = 1
+
+    # side handles
+    for y in range(18, 22):
+        pot_bitmap[2, y] = 1
+        pot_bitmap[29, y] = 1
+
+    # lid body (x: 8–23, y: 11–14)
+    for y in range(11, 15):
+        for x in range(8, 24):
+            pot_bitmap[x, y] = 1
+
+    # lid handle
+    for y in range(8, 11):
+        for x in range(14, 18):
+            pot_bitmap[x, y] = 1
+
+    pot_tile = displayio.TileGrid(pot_bitmap, pixel_shader=pot_palette, x=48, y=8)
+    return pot_tile
+
+
+# ===================== Splash screen =====================
+
+def show_splash():
+    """
+    Animated splash screen:
+    - boiling pot + lid jiggle
+    - retro 'COOKING' / 'GAME' title text
+    """
+    root = render.new_scene()
+
+    # background
+    bg_bitmap = displayio.Bitmap(128, 64, 1)
+    bg_palette = displayio.Palette(1)
+    bg_palette[0] = 0x000000
+    bg_tile = displayio.TileGrid(bg_bitmap, pixel_shader=bg_palette, x=0, y=0)
+    root.append(bg_tile)
+
+    # --- pot body (slightly higher to leave room for title) ---
+    pot_w = 32
+    pot_h = 14
+    pot_bitmap = displayio.Bitmap(pot_w, pot_h, 2)
+    pot_palette = displayio.Palette(2)
+    pot_palette[0] = 0x000000  # transparent/background
+    pot_palette[1] = 0xFFFFFF  # pot color
+
+    # body
+    for y in range(6, pot_h):
+        for x in range(2, pot_w - 2):
+            pot_bitmap[x, y] = 1
+    # top line
+    for x in range(0, pot_w):
+        pot_bitmap[x, 5] = 1
+
+    pot_x = (128 - pot_w) // 2
+    pot_y = 14
+
+    pot_tile = displayio.TileGrid(
+        pot_bitmap,
+        pixel_shader=pot_palette,
+        x=pot_x,
+        y=pot_y,
+    )
+    root.append(pot_tile)
+
+    # --- lid (slightly resting on top) ---
+    lid_w = 24
+    lid_h = 5
+    lid_bitmap = displayio.Bitmap(lid_w, lid_h, 2)
+    lid_palette = displayio.Palette(2)
+    lid_palette[0] = 0x000000
+    lid_palette[1] = 0xFFFFFF
+
+    # lid body
+    for y in range(2, lid_h):
+        for x in range(0, lid_w):
+            lid_bitmap[x, y] = 1
+    # knob
+    lid_bitmap[lid_w // 2, 0] = 1
+    lid_bitmap[lid_w // 2, 1] = 1
+
+    lid_base_x = pot_x + 4
+    lid_base_y = pot_y - 3
+
+    lid_tile = displayio.TileGrid(
+        lid_bitmap,
+        pixel_shader=lid_palette,
+        x=lid_base_x,
+        y=lid_base_y,
+    )
+    root.append(lid_tile)
+
+    # --- steam blobs ---
+    steam_bitmap = displayio.Bitmap(3, 3, 2)
+    steam_palette = displayio.Palette(2)
+    steam_palette[0] = 0x000000
+    steam_palette[1] = 0xFFFFFF
+
+    for y in range(3):
+        for x in range(3):
+            steam_bitmap[x, y] = 1
+
+    steam1 = displayio.TileGrid(
+        steam_bitmap,
+        pixel_shader=steam_palette,
+        x=pot_x + 8,
+        y=pot_y - 10,
+    )
+    steam2 = displayio.TileGrid(
+        steam_bitmap,
+        pixel_shader=steam_palette,
+        x=pot_x + pot_w - 11,
+        y=pot_y - 7,
+    )
+    root.append(steam1)
+    root.append(steam2)
+
+    # --- title text ('COOKING' / 'GAME') ---
+    title1 = label.Label(
+        league_font,
+        text="COOKING",
+        color=0xFFFFFF,
+    )
+    title1.anchor_point = (0.5, 0.5)            # centered
+    title1.anchored_position = (64, 40)         # slightly above center
+
+    title2 = label.Label(
+        league_font,
+        text="GAME",
+        color=0xFFFFFF,
+    )
+    title2.anchor_point = (0.5, 0.5)
+    title2.anchored_position = (64, 54)         # a bit below COOKING
+
+    root.append(title1)
+    root.append(title2)
+
+    # --- animation loop (lid jiggle + steam drift) ---
+    start = time.monotonic()
+    frame = 0
+    while time.monotonic() - start < 2.0:  # ~2 seconds
+        # lid jiggle
+        lid_tile.y = lid_base_y - (frame % 2)
+
+        # steam moves up a bit
+        steam1.y = (pot_y - 10) - (frame % 4)
+        steam2.y = (pot_y - 7) - ((frame + 2) % 4)
+
+        frame += 1
+        time.sleep(0.06)
+
+# ===================== Screens =====================
+
+def show_menu():
+    """Difficulty selection screen with highlight bar."""
+    root = render.new_scene()
+
+    render.pixels_off()  # always off in menu
+
+    # background
+    bg_bitmap = displayio.Bitmap(128, 64, 1)
+    bg_palette = displayio.Palette(1)
+    bg_palette[0] = 0x000000
+    bg_tile = displayio.TileGrid(bg_bitmap, pixel_shader=bg_palette, x=0, y=0)
+    root.append(bg_tile)
+
+    # centered title
+    title = label.Label(
+        terminalio.FONT,
+        text="COOKING GAME",
+        color=0xFFFFFF,
+    )
+    title.anchor_point = (0.5, 0.0)      # center horizontally, top vertically
+    title.anchored_position = (64, 2)
+    root.append(title)
+
+    # difficulty options (the bars exactly tile the space under the title)
+    options = DIFFICULTY_NAMES
+
+    base_y = 22
+    line_gap = 12
+
+    for idx, text in enumerate(options):
+        line_y = base_y + idx * line_gap
+        selected = (idx == st.menu_index)
+
+        bar_w = 110
+        bar_h = 12
+
+        bar_x = (128 - bar_w) // 2
+        bar_y = line_y - 6
+
+        if selected:
+            # filled white bar with black text
+            bar_bitmap = displayio.Bitmap(bar_w, bar_h, 1)
+            bar_palette = displayio.Palette(1)
+            bar_palette[0] = 0xFFFFFF
+
+            for yy in range(bar_h):
+                for xx in range(bar_w):
+                    bar_bitmap[xx, yy] = 0
+
+            bar_tile = displayio.TileGrid(
+                bar_bitmap,
+                pixel_shader=bar_palette,
+                x=bar_x,
+                y=bar_y
+            )
+            root.append(bar_tile)
+            text_color = 0x000000
+        else:
+            text_color = 0xFFFFFF
+
+        text_width = len(text) * 6
+        text_x = (128 - text_width) // 2
+
+        lbl = label.Label(
+            terminalio.FONT,
+            text=text,
+            color=text_color,
+            x=text_x,
+            y=line_y
+        )
+        root.append(lbl)
+
+
+# ===================== Step prefetch =====================
+#
+# While the player works on step n, an idle frame builds step n+1's scene
+# (strings, labels, background, HUD step counter), picks its HEAT target
+# and its LED colour. The score step n+1 opens with is not known yet, but
+# it can only be one of a few values: one per way step n can be cleared
+# (a RHYTHM judgment, or the fixed points of the other modes). Each gets a
+# hidden variant with its score label (and, in RHYTHM, its judgment line).
+# Clearing a step then only swaps in the OLED root group, unhides the
+# variant that matches the new score and resets a handful of values: no
+# formatting, allocation or label layout between the player's move and
+# the next prompt. The judgment's offset ("+12ms") is filled in by the
+# next quiet frame.
+
+PREFETCH_ENABLED = True         # False = build every step on the spot (A/B timing)
+
+next_step = -1                  # step the prefetched scene belongs to
+next_scene = None
+next_variants = {}              # opening score -> (hidden group, judgment label or None)
+next_heat_lines = None          # HEAT: (status, NOW:) labels, see render.set_heat_lines()
+next_heat_target = HEAT_NONE
+next_led = (0, 0, 0)
+
+judgment_label = None           # shown judgment whose offset text is still to come
+
+
+def step_outcomes(step):
+    """[(opening score, judgment text)] for every way step `step` can be reached."""
+    if step == st.current_step:
+        return [(st.score, st.rhythm_last_text)]    # already reached
+    if st.difficulty == DIFFICULTY_RHYTHM:
+        return [(st.score + RHYTHM_POINTS[j], JUDGE_NAMES[j]) for j in range(len(JUDGE_NAMES))]
+    return [(st.score + STEP_POINTS[st.difficulty], "")]
+
+
+def prefetch_step(step):
+    """Build everything step `step` shows, without touching the screen."""
+    global next_step, next_scene, next_variants, next_heat_lines, next_heat_target, next_led
+
+    action = st.recipe[step]
+    mode = f"{DIFFICULTY_NAMES[st.difficulty]} MODE"
+    next_variants = {}
+    next_heat_lines = None
+
+    if action == ACTION_HEAT:
+        next_heat_target = (hw.now_ms() // 1000) % 3  # rotate target
+        next_scene = render.build_scene([mode], hud=True)
+        # both lines change during the step; detect_heat() only sets their text
+        next_heat_lines = (
+            render.add_line(next_scene, 1, "DO: HEAT"),
+            render.add_line(next_scene, 2, f"SET HEAT: {HEAT_NAMES[next_heat_target]}"),
+        )
+    else:
+        next_heat_target = HEAT_NONE
+        next_scene = render.build_scene([mode, f"DO: {st.action_name(action)}"], hud=True)
+    render.add_hud_step(next_scene, step + 1, len(st.recipe))
+
+    for score, judgment in step_outcomes(step):
+        variant = displayio.Group()
+        variant.hidden = True
+        render.add_hud_score(variant, score)
+        judgment_line = None
+        if st.difficulty == DIFFICULTY_RHYTHM and action != ACTION_HEAT:
+            # the previous step's judgment, on the third line
+            judgment_line = render.add_line(variant, 2, judgment)
+        next_scene.append(variant)
+        next_variants[score] = (variant, judgment_line)
+
+    next_led = (0, 0, 0)        # every step starts with the NeoPixel off
+    next_step = step
+
+
+def prefetch_next():
+    """Idle-frame hook: finish the judgment line, then prefetch the following step once."""
+    global judgment_label
+    if judgment_label is not None:
+        render.set_line(judgment_label, st.rhythm_last_text)
+        judgment_label = None
+    step = st.current_step + 1
+    if PREFETCH_ENABLED and step != next_step and step < len(st.recipe):
+        prefetch_step(step)
+        qos.exempt_frame()      # planned work, not an overrun
+
+
+def drop_prefetch():
+    """Forget the prefetched step (it is on screen, or belongs to an old game)."""
+    global next_step, next_scene, next_variants, next_heat_lines
+    next_step = -1
+    next_scene = None
+    next_variants = {}
+    next_heat_lines = None
+
+
+def clear_prefetch():
+    """New game: nothing prefetched, no judgment line waiting."""
+    global judgment_label
+    drop_prefetch()
+    judgment_label = None
+
+
+def prefetched():
+    """True if the step just reached was built ahead, with its opening score."""
+    return next_step == st.current_step and st.score in next_variants
+
+
+def show_current_step():
+    """Step UI while playing: swap in the (pre)built scene under the HUD."""
+    global judgment_label
+    if not prefetched():
+        prefetch_step(st.current_step)      # first step, resume, or prefetch disabled
+
+    tel.reset_step_stats()
+    gestures.reset_detectors()
+    gestures.reset_gestures()
+    render.hud_reset_bar()
+
+    if st.recipe[st.current_step] == ACTION_HEAT:
+        st.heat_start_pos = inp.enc_pos
+        st.heat_target = next_heat_target
+        st.heat_level = HEAT_NONE
+        st.heat_moved = False
+
+        st.heat_holding = False
+        st.heat_hold_start_ms = 0
+        st.heat_last_draw_ms = 0
+        st.heat_shown_level = HEAT_NONE
+    render.heat_status_label, render.heat_now_label = next_heat_lines or (None, None)
+
+    variant, judgment_label = next_variants[st.score]
+    variant.hidden = False
+    render.set_led(next_led)
+    render.show_scene(next_scene, hud=True)
+    drop_prefetch()
+
+
+# ===================== Game over / win =====================
+
+def show_game_over(reason=""):
+    render.draw_screen([
+        "GAME OVER!",
+        str(reason)[:18],
+        f"SCORE: {st.score}",
+        "BTN: Menu",
+    ])
+    render.flash_color((255, 0, 0), 800)
+
+
+def show_game_win():
+    detail = "Cooking done :)"
+    if st.difficulty == DIFFICULTY_RHYTHM:
+        detail = "P{} G{} M{}".format(*st.rhythm_counts)
+    render.draw_screen([
+        "YOU WIN!",
+        detail,
+        f"SCORE: {st.score}",
+        "BTN: Menu",
+    ])
+    render.rainbow_spin(3000)
+    render.pixels_off()
@@ -0,0 +1,116 @@
+"""
+Game constants and the state shared between modules.
+
+Other modules read and write these as attributes (st.score, st.state, ...)
+so there is exactly one copy of every value.
+"""
+
+from cooking import rhythm
+
+
+# ===================== Game constants =====================
+
+ACTION_ADD = 0
+ACTION_MIX = 1
+ACTION_HEAT = 2
+ACTION_TILT = 3
+ACTION_STIR = 4
+ACTION_FLIP = 5
+ACTION_NAMES = ["ADD", "MIX", "HEAT", "TILT", "STIR", "FLIP"]
+
+STATE_MENU = 0
+STATE_PLAYING = 1
+STATE_GAME_OVER = 2
+STATE_GAME_WIN = 3
+
+DIFFICULTY_EASY = 0
+DIFFICULTY_NORMAL = 1
+DIFFICULTY_HARD = 2
+DIFFICULTY_RHYTHM = 3
+DIFFICULTY_NAMES = ["EASY", "NORMAL", "HARD", "RHYTHM"]
+
+MENU_TICKS_PER_STEP = 2
+STEP_POINTS = [10, 15, 20]      # per cleared step: EASY, NORMAL, HARD (RHYTHM: RHYTHM_POINTS)
+
+
+# ===================== HEAT constants =====================
+
+HEAT_NONE = -1
+HEAT_LOW = 0
+HEAT_MID = 1
+HEAT_HIGH = 2
+HEAT_NAMES = ["LOW", "MID", "HIGH"]
+
+HEAT_TICKS_REQUIRED = 1
+HEAT_TIMEOUT_MS = 9000
+HEAT_HOLD_MS = 1200
+HEAT_DRAW_THROTTLE_MS = 120
+HEAT_CLEAR_SHOW_MS = 2500
+
+heat_target = HEAT_MID
+heat_level = HEAT_NONE
+heat_moved = False
+
+heat_holding = False
+heat_hold_start_ms = 0
+heat_hold_start_ns = 0  # detent that reached the target (RHYTHM judging)
+
+heat_last_draw_ms = 0
+heat_shown_level = HEAT_NONE    # level the NOW: line currently shows
+heat_just_cleared = False
+heat_clear_ms = 0
+
+heat_start_pos = 0      # encoder position when the HEAT step started
+
+
+# ===================== RHYTHM constants =====================
+
+RHYTHM_BPM = 75                 # 800 ms per beat
+RHYTHM_BEATS_PER_STEP = 2       # one action every other beat
+RHYTHM_LEAD_IN_BEATS = 4        # count-in before the first action
+RHYTHM_MAX_MISSES = 3
+RHYTHM_POINTS = [20, 10, 0]     # PERFECT, GOOD, MISS
+RHYTHM_HEAT_HOLD_MS = 300       # shorter hold so HEAT fits between beats
+
+# cues are fired early by roughly the output latency, so they *appear* on the beat
+RHYTHM_LED_LEAD_NS = 2 * rhythm.NS_PER_MS       # one NeoPixel write
+RHYTHM_OLED_LEAD_NS = 25 * rhythm.NS_PER_MS     # one dirty-page I2C refresh
+RHYTHM_CUE_ON_NS = 120 * rhythm.NS_PER_MS
+
+rhythm_origin_ns = 0
+rhythm_led_beat = 0             # next beat to cue on the NeoPixel
+rhythm_dot_beat = 0             # next beat to cue on the OLED
+rhythm_led_off_ns = 0
+rhythm_dot_off_ns = 0
+rhythm_counts = [0, 0, 0]       # PERFECT, GOOD, MISS
+rhythm_last_text = ""
+
+# ===================== Global game state & score =====================
+
+state = STATE_MENU
+difficulty = DIFFICULTY_EASY
+
+current_step = 0
+recipe = []
+move_start_ms = 0
+time_limit_ms = 5000
+
+menu_index = 0
+last_menu_pos = 0
+
+score = 0  # player score
+last_step_change_ms = 0
+
+
+# ===================== NVM layout =====================
+#
+# Byte ranges of microcontroller.nvm, one per module that persists data.
+
+NVM_CAL_OFFSET = 0              # cooking.calibration
+NVM_CAL_SIZE = 32
+NVM_CHECKPOINT_OFFSET = 32      # cooking.checkpoint (two 39-byte slots)
+NVM_CHECKPOINT_SIZE = 78
+
+
+def action_name(action):
+    return ACTION_NAMES[action]
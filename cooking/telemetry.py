@@ -0,0 +1,216 @@
+"""
+Binary telemetry over the USB CDC data port.
+"""
+
+import struct
+import usb_cdc
+
+from cooking import hardware as hw
+from cooking import input as inp
+from cooking import state as st
+
+
+# ===================== Telemetry (USB CDC data channel) =====================
+#
+# Fixed-size binary records are packed into a preallocated buffer and
+# written out a little at a time from the main loop, only while a host has
+# the data port open. Layout of every record:
+#   sync (0xA5), type, payload length (u16), payload
+# tools/telemetry_host.py decodes the stream on the computer side.
+
+SYNC = 0xA5
+TYPE_STEP = 0x53            # 'S'
+TYPE_FRAME = 0x46           # 'F', screen capture (see render.capture_frame())
+TYPE_DETECTOR = 0x44        # 'D', detector cost
+TYPE_TRANSITION = 0x54      # 'T', step transition cost
+TYPE_QOS = 0x51             # 'Q', frame deadline stats (see qos.report())
+TYPE_CHECKPOINT = 0x43      # 'C', checkpoint write cost
+
+# sync, type, len, t_ms, event, step, action, difficulty,
+# latency_ms, score, peak_delta (x100 m/s^2), accel samples
+STEP_FMT = "<BBHIBBBBHHHH"
+STEP_SIZE = struct.calcsize(STEP_FMT)
+
+# sync, type, len, t_ms, detector id, action, avg_us, max_us, runs, skipped,
+# detector time of the last frame (us)
+DET_FMT = "<BBHIBBHHHHH"
+DET_SIZE = struct.calcsize(DET_FMT)
+
+# sync, type, len, t_ms, step, prefetched (0/1), transition time (us)
+TRANS_FMT = "<BBHIBBI"
+TRANS_SIZE = struct.calcsize(TRANS_FMT)
+
+# sync, type, len, t_ms, step, write time (us), writes, coalesced steps
+# (counters wrap at 16 bits)
+CKPT_FMT = "<BBHIBIHH"
+CKPT_SIZE = struct.calcsize(CKPT_FMT)
+
+EV_START = 0
+EV_CLEAR = 1
+EV_TIMEOUT = 2
+EV_HEAT_TIMEOUT = 3
+EV_WRONG_MOVE = 4
+EV_WIN = 5
+EV_PERFECT = 6              # RHYTHM judgments: PERFECT + rhythm.JUDGE_*
+EV_GOOD = 7
+EV_MISS = 8
+EV_RESUME = 9               # game picked up from a checkpoint after a reset
+
+NO_ACTION = 255
+
+BUFFER_SIZE = 2048          # room for one worst-case screen frame
+FLUSH_MAX = 128             # max bytes handed to USB per frame
+
+port = usb_cdc.data         # None unless boot.py enabled the data port
+if port is not None:
+    port.write_timeout = 0  # never block the game loop
+
+buf = bytearray(BUFFER_SIZE)
+view = memoryview(buf)
+fill = 0                    # bytes queued
+sent = 0                    # bytes of the queue already written
+dropped = 0                 # records lost because the buffer was full
+
+# per-step sensor stats (reset whenever a new step is shown)
+peak_delta = 0              # raw counts
+samples = 0
+
+
+def active():
+    """True only when a host has the data port open."""
+    return port is not None and port.connected
+
+
+def reserve(size):
+    """Return the buffer offset for a new record, or -1 if it does not fit."""
+    global fill, sent, dropped
+
+    pending = fill - sent
+    if fill + size > BUFFER_SIZE and 0 < pending <= sent:
+        # slide the unsent tail back to the start (regions never overlap)
+        view[0:pending] = view[sent:fill]
+        fill = pending
+        sent = 0
+
+    if fill + size > BUFFER_SIZE:
+        dropped += 1
+        return -1
+
+    offset = fill
+    fill += size
+    return offset
+
+
+def record_step(event, action, latency_ms):
+    """Queue one step record. Costs a single bool check when no host is attached."""
+    if not active():
+        return
+
+    offset = reserve(STEP_SIZE)
+    if offset < 0:
+        return
+
+    struct.pack_into(
+        STEP_FMT, buf, offset,
+        SYNC, TYPE_STEP, STEP_SIZE - 4,
+        hw.now_ms() & 0xFFFFFFFF,
+        event,
+        st.current_step & 0xFF,
+        action,
+        st.difficulty,
+        min(max(latency_ms, 0), 0xFFFF),
+        min(st.score, 0xFFFF),
+        min(int(peak_delta * inp.ACCEL_MS2_PER_LSB * 100), 0xFFFF),
+        min(samples, 0xFFFF),
+    )
+
+
+def record_detector(det, frame_us):
+    """Queue one detector cost record (see gestures.register_detector())."""
+    if not active():
+        return
+
+    offset = reserve(DET_SIZE)
+    if offset < 0:
+        return
+
+    struct.pack_into(
+        DET_FMT, buf, offset,
+        SYNC, TYPE_DETECTOR, DET_SIZE - 4,
+        hw.now_ms() & 0xFFFFFFFF,
+        det["id"],
+        det["action"],
+        min(max(det["avg_us"], 0), 0xFFFF),
+        min(det["max_us"], 0xFFFF),
+        min(det["runs"], 0xFFFF),
+        min(det["skipped"], 0xFFFF),
+        min(frame_us, 0xFFFF),
+    )
+
+
+def record_transition(prefetched, transition_us):
+    """Queue how long clearing a step took until the next prompt was up."""
+    if not active():
+        return
+
+    offset = reserve(TRANS_SIZE)
+    if offset < 0:
+        return
+
+    struct.pack_into(
+        TRANS_FMT, buf, offset,
+        SYNC, TYPE_TRANSITION, TRANS_SIZE - 4,
+        hw.now_ms() & 0xFFFFFFFF,
+        st.current_step & 0xFF,
+        1 if prefetched else 0,
+        transition_us,
+    )
+
+
+def record_checkpoint(write_us, writes, coalesced):
+    """Queue the cost of one checkpoint write to nvm."""
+    if not active():
+        return
+
+    offset = reserve(CKPT_SIZE)
+    if offset < 0:
+        return
+
+    struct.pack_into(
+        CKPT_FMT, buf, offset,
+        SYNC, TYPE_CHECKPOINT, CKPT_SIZE - 4,
+        hw.now_ms() & 0xFFFFFFFF,
+        st.current_step & 0xFF,
+        write_us,
+        writes & 0xFFFF,
+        coalesced & 0xFFFF,
+    )
+
+
+def reset_step_stats():
+    global peak_delta, samples
+    peak_delta = 0
+    samples = 0
+
+
+def flush():
+    """Hand at most FLUSH_MAX queued bytes to USB without blocking."""
+    global fill, sent
+
+    if fill == 0:
+        return
+
+    if not active():
+        # host went away: nobody is listening, throw the backlog out
+        fill = 0
+        sent = 0
+        return
+
+    end = min(fill, sent + FLUSH_MAX)
+    written = port.write(view[sent:end])
+    if written:
+        sent += written
+
+    if sent >= fill:
+        fill = 0
+        sent = 0
@@ -0,0 +1,140 @@
+"""
+Precompile the game modules with mpy-cross and report their footprint.
+
+Usage:
+    python tools/build.py                          # cooking/*.py -> lib/cooking/*.mpy
+    python tools/build.py --source                 # copy the .py files instead
+    python tools/build.py --mpy-cross ~/bin/mpy-cross-10.0.0
+    python tools/build.py --boot-log py.txt mpy.txt   # compare BOOT console lines
+
+Either way the board gets its modules from lib/cooking/ and the tiny code.py
+at the root just imports cooking.game, so the two builds differ only in
+what is inside lib/cooking/. mpy-cross has to match the CircuitPython
+version on the board (10.x): download it from
+https://adafruit-circuit-python.s3.amazonaws.com/index.html?prefix=bin/mpy-cross/
+
+Each boot prints a line like
+
+    BOOT build=mpy import_ms=412 ready_ms=1630 mem_free=61232 mem_alloc=54016 cal=1 resume=0 resume_ms=2
+
+(see boot_report() in cooking/game.py). Save the serial console of a few
+boots of each build and pass the files to --boot-log to get the
+compiled-on-device vs precompiled comparison. Boots that resumed a
+checkpointed game (resume=1) are listed as their own rows: their ready_ms
+is the time from reset to resumed play, resume_ms the part of it spent
+loading the checkpoint and rebuilding the interrupted step.
+"""
+
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SRC_DIR = os.path.join(ROOT, "cooking")
+OUT_DIR = os.path.join(ROOT, "lib", "cooking")
+
+BOOT_RE = re.compile(r"BOOT build=(\w+)((?: \w+=-?\d+)+)")
+BOOT_FIELDS = ["import_ms", "ready_ms", "resume_ms", "mem_free", "mem_alloc"]
+
+
+def sources():
+    return sorted(f for f in os.listdir(SRC_DIR) if f.endswith(".py"))
+
+
+def build(mpy_cross, source_only):
+    """Fill lib/cooking/; returns [(module, source bytes, output bytes)]."""
+    if os.path.isdir(OUT_DIR):
+        shutil.rmtree(OUT_DIR)
+    os.makedirs(OUT_DIR)
+
+    rows = []
+    for name in sources():
+        src = os.path.join(SRC_DIR, name)
+        if source_only:
+            out = os.path.join(OUT_DIR, name)
+            shutil.copyfile(src, out)
+        else:
+            out = os.path.join(OUT_DIR, name[:-3] + ".mpy")
+            subprocess.run([mpy_cross, "-o", out, src], check=True)
+        rows.append((name[:-3], os.path.getsize(src), os.path.getsize(out)))
+    return rows
+
+
+def size_report(rows, source_only):
+    kind = ".py copy" if source_only else ".mpy"
+    lines = [f"{'module':<12} {'source':>8} {kind:>9} {'ratio':>6}"]
+    for module, src_size, out_size in rows:
+        lines.append(f"{module:<12} {src_size:>8} {out_size:>9} {out_size / src_size:>6.2f}")
+    total_src = sum(r[1] for r in rows)
+    total_out = sum(r[2] for r in rows)
+    lines.append(f"{'total':<12} {total_src:>8} {total_out:>9} {total_out / total_src:>6.2f}")
+    return "\n".join(lines)
+
+
+def parse_boot_logs(paths):
+    """{build: [ {field: value} ]} from every BOOT line (resumed boots as build+resume)."""
+    boots = {}
+    for path in paths:
+        with open(path, errors="replace") as f:
+            for line in f:
+                m = BOOT_RE.search(line)
+                if not m:
+                    continue
+                fields = dict(kv.split("=") for kv in m.group(2).split())
+                build_name = m.group(1)
+                if fields.get("resume") == "1":
+                    build_name += "+resume"
+                boots.setdefault(build_name, []).append(
+                    {k: int(fields[k]) for k in BOOT_FIELDS if k in fields})
+    return boots
+
+
+def boot_report(boots):
+    lines = [f"{'build':<10} {'boots':>5} " + " ".join(f"{f:>10}" for f in BOOT_FIELDS)]
+    means = {}
+    for build_name in sorted(boots):
+        samples = boots[build_name]
+        means[build_name] = {
+            f: sum(s.get(f, 0) for s in samples) / len(samples) for f in BOOT_FIELDS
+        }
+        lines.append(f"{build_name:<10} {len(samples):>5} "
+                     + " ".join(f"{means[build_name][f]:>10.0f}" for f in BOOT_FIELDS))
+    if "py" in means and "mpy" in means:
+        lines.append(f"{'mpy-py':<10} {'':>5} "
+                     + " ".join(f"{means['mpy'][f] - means['py'][f]:>+10.0f}"
+                                for f in BOOT_FIELDS))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mpy-cross", default="mpy-cross", help="mpy-cross executable")
+    parser.add_argument("--source", action="store_true",
+                        help="copy .py files (compiled on the board) instead of .mpy")
+    parser.add_argument("--boot-log", nargs="+", metavar="LOG",
+                        help="only summarize BOOT lines from serial console logs")
+    args = parser.parse_args()
+
+    if args.boot_log:
+        boots = parse_boot_logs(args.boot_log)
+        if not boots:
+            print("no BOOT lines found", file=sys.stderr)
+            return 1
+        print(boot_report(boots))
+        return 0
+
+    if not args.source and shutil.which(args.mpy_cross) is None:
+        print(f"{args.mpy_cross} not found (use --mpy-cross PATH or --source)", file=sys.stderr)
+        return 1
+
+    rows = build(args.mpy_cross, args.source)
+    print(size_report(rows, args.source))
+    print(f"\nwrote {len(rows)} modules to {os.path.relpath(OUT_DIR, ROOT)}/")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+Checks the screen-capture path without a board attached.
+
+Round trip: frames go through the encoder the board runs and the
+viewer's decoder,
+
+    pixels -> raw displayio buffer -> packbits() (cooking/packbits.py)
+           -> 'F' packet -> iter_packets() -> decode_frame() -> pixels
+
+and must come back pixel for pixel. This covers the PackBits reference
+vector from Apple TN1023, a corpus of synthetic frames (blank, full,
+stripes, checkerboard, worst case, random) and any .pbm in the given
+directories. It checks the codec, not the board's framebuffer layout:
+from_pixels() and to_pixels() are inverses of each other either way.
+
+Golden: a NAME.cap frame recorded from the board (screen_viewer.py
+--save) next to NAME.pbm, the image the OLED really showed, is decoded
+the way the viewer decodes it and compared pixel for pixel. This is
+what catches a wrong layout assumption (word swap, bit order).
+
+The exit status is 1 if any check fails.
+
+Usage:
+    python tools/capture_check.py
+    python tools/capture_check.py goldens/ --seed 7
+"""
+
+import argparse
+import os
+import random
+import struct
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from cooking.packbits import RAW_SIZE, RLE_MAX, packbits  # noqa: E402
+from cdc_stream import HEADER_FMT, SYNC, iter_packets  # noqa: E402
+from screen_viewer import (  # noqa: E402
+    FRAME_HEADER_FMT, HEIGHT, TYPE_FRAME, WIDTH, decode_frame, diff_pixels,
+    from_pixels, read_pbm, to_pixels, unpackbits,
+)
+
+# Apple Technical Note TN1023
+TN1023_IN = bytes.fromhex("AAAAAA80002AAAAAAAAA80002A22AAAAAAAAAAAAAAAAAAAA")
+TN1023_OUT = bytes.fromhex("FEAA0280002AFDAA0380002A22F7AA")
+
+
+def encode(raw):
+    dst = bytearray(RLE_MAX)
+    size = packbits(memoryview(raw), memoryview(dst))
+    return bytes(dst[:size])
+
+
+def via_stream(pixels, number=0):
+    """Send one frame through packet framing and the viewer's decoder."""
+    rle = encode(from_pixels(pixels))
+    payload = struct.pack(FRAME_HEADER_FMT, number, 0, 0) + rle
+    stream = struct.pack(HEADER_FMT, SYNC, TYPE_FRAME, len(payload)) + payload
+    chunks = [stream[i:i + 256] for i in range(0, len(stream), 256)]
+
+    def read(n):
+        return chunks.pop(0) if chunks else None
+
+    for ptype, data in iter_packets(read):
+        if ptype == TYPE_FRAME:
+            return decode_frame(data)["pixels"], len(rle)
+    raise ValueError("no frame came out of the stream")
+
+
+def corpus(rng):
+    """(name, pixels) synthetic frames that cover the encoder's branches."""
+    def frame(f):
+        return [[f(x, y) & 1 for x in range(WIDTH)] for y in range(HEIGHT)]
+
+    yield "blank", frame(lambda x, y: 0)
+    yield "full", frame(lambda x, y: 1)
+    yield "checkerboard", frame(lambda x, y: x + y)
+    yield "stripes", frame(lambda x, y: (x // 3) + (y // 5))
+    yield "hud-bar", frame(lambda x, y: y == 63 and x < 77 or y < 8 and x % 6 < 4)
+    # bytes never repeat three times: every literal run is at its longest
+    worst = bytes((i * 7) & 0xFF for i in range(RAW_SIZE))
+    yield "worst-case", to_pixels(worst)
+    for i in range(8):
+        density = rng.random()
+        yield f"random-{i}", frame(lambda x, y: rng.random() < density)
+
+
+def find_frames(paths):
+    """.pbm files in `paths` (directories or files): [(name, pixels, .cap bytes or None)]."""
+    found = []
+    for path in paths:
+        names = [path]
+        if os.path.isdir(path):
+            names = sorted(os.path.join(path, n) for n in os.listdir(path) if n.endswith(".pbm"))
+        for name in names:
+            cap = None
+            if os.path.exists(name[:-4] + ".cap"):
+                with open(name[:-4] + ".cap", "rb") as f:
+                    cap = f.read()
+            found.append((os.path.basename(name), read_pbm(name), cap))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("screens", nargs="*",
+                        help="directories (or files) of .pbm screens, with .cap for goldens")
+    parser.add_argument("--seed", type=int, default=30)
+    args = parser.parse_args()
+
+    failures = 0
+
+    got = encode(TN1023_IN)
+    ok = got == TN1023_OUT and unpackbits(got) == TN1023_IN
+    failures += not ok
+    print(f"{'TN1023 vector':<28} {'ok' if ok else 'FAIL ' + got.hex()}")
+
+    screens = find_frames(args.screens)
+    frames = list(corpus(random.Random(args.seed))) + [(n, p) for n, p, _ in screens]
+    goldens = [(n, p, cap) for n, p, cap in screens if cap is not None]
+
+    for number, (name, pixels) in enumerate(frames):
+        try:
+            back, size = via_stream(pixels, number)
+        except (ValueError, IndexError, struct.error) as e:
+            failures += 1
+            print(f"{name:<28} FAIL ({e})")
+            continue
+        diff = diff_pixels(back, pixels)
+        ok = diff == 0 and size <= RLE_MAX
+        failures += not ok
+        print(f"{name:<28} {size:5d} B  " + ("ok" if ok else f"FAIL ({diff} px differ)"))
+
+    if goldens:
+        print("\ngolden: board capture vs screen")
+    for name, pixels, cap in goldens:
+        try:
+            diff = diff_pixels(decode_frame(cap)["pixels"], pixels)
+        except (ValueError, IndexError, struct.error) as e:
+            failures += 1
+            print(f"{name:<28} FAIL ({e})")
+            continue
+        failures += diff != 0
+        print(f"{name:<28} " + ("ok" if diff == 0 else f"FAIL ({diff} px differ)"))
+
+    total = len(frames) + 1 + len(goldens)
+    print(f"\n{total - failures}/{total} passed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+Shared reader for the binary stream the game writes to usb_cdc.data.
+
+Every packet is:
+    sync (0xA5), type (1 byte), payload length (u16 little-endian), payload
+"""
+
+import struct
+
+SYNC = 0xA5
+HEADER_FMT = "<BBH"
+HEADER_SIZE = struct.calcsize(HEADER_FMT)
+
+TYPE_STEP = 0x53      # 'S'
+TYPE_DETECTOR = 0x44  # 'D'
+TYPE_TRANSITION = 0x54  # 'T'
+TYPE_QOS = 0x51  # 'Q'
+TYPE_CHECKPOINT = 0x43  # 'C'
+
+
+def open_port(port, baud=115200):
+    """Open the board's data port (pyserial is only needed on the host)."""
+    import serial
+
+    ser = serial.Serial(port, baud, timeout=0.1)
+    ser.dtr = True  # the board only sends while the host holds DTR
+    return ser
+
+
+def iter_packets(read):
+    """
+    Yield (type, payload) tuples from a read(n) callable.
+
+    Bytes that do not start a valid packet are skipped, so the reader
+    resyncs on its own after a partial write or a reconnect.
+    """
+    buf = bytearray()
+    while True:
+        chunk = read(256)
+        if chunk is None:
+            return
+        if not chunk:
+            continue
+        buf.extend(chunk)
+
+        while True:
+            start = buf.find(bytes([SYNC]))
+            if start < 0:
+                buf.clear()
+                break
+            if start:
+                del buf[:start]
+            if len(buf) < HEADER_SIZE:
+                break
+            _, ptype, length = struct.unpack_from(HEADER_FMT, buf, 0)
+            if len(buf) < HEADER_SIZE + length:
+                break
+            payload = bytes(buf[HEADER_SIZE:HEADER_SIZE + length])
+            del buf[:HEADER_SIZE + length]
+            yield ptype, payload
@@ -0,0 +1,215 @@
+"""
+Power-loss report for the game checkpoint.
+
+Plays many games through cooking/checkpoint.py with a file standing in
+for microcontroller.nvm. Power fails at random moments, including in the
+middle of a checkpoint write (only the first few bytes of the record
+land). After every failure the file is opened again, as on the next
+boot, and the checkpoint read back must be exactly the last record whose
+write completed.
+
+The report shows:
+
+    outcome  - how each reboot went (resumed, back to the menu, wrong)
+    lost     - steps the player has to repeat after a resume
+    writes   - flash writes per cleared step, coalesced vs one per step
+    cost     - time per write on this computer (the board reports its own
+               write times in 'C' telemetry records, see --costs in
+               tools/telemetry_host.py)
+
+Usage:
+    python tools/checkpoint_sim.py
+    python tools/checkpoint_sim.py --games 5000 --loss 0.05 --torn 0.3 --seed 7
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from cooking import checkpoint  # noqa: E402
+from cooking.state import (  # noqa: E402
+    ACTION_NAMES, DIFFICULTY_NAMES, STATE_PLAYING,
+)
+from stats import percentile  # noqa: E402
+
+NVM_SIZE = 8192                 # microcontroller.nvm on the ESP32-C3
+RECIPE_LENGTHS = [10, 13, 18, 12]   # Easy, Normal, Hard, RHYTHM (cooking/game.py)
+STEP_MS = (800, 4000)           # time the player takes per step
+FRAME_MS = 12                   # frame work + the 10 ms sleep
+
+
+class PowerLoss(Exception):
+    pass
+
+
+class FileNVM:
+    """
+    microcontroller.nvm stand-in: a fixed-size byte array kept in a file.
+
+    Every slice write goes straight to the file. Setting `cut` makes the
+    next write stop after that many bytes and raise PowerLoss.
+    """
+
+    def __init__(self, path, size=NVM_SIZE):
+        self.path = path
+        self.size = size
+        self.cut = None
+        if not os.path.exists(path) or os.path.getsize(path) != size:
+            with open(path, "wb") as f:
+                f.write(b"\xff" * size)     # erased flash
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        with open(self.path, "rb") as f:
+            return f.read()[index]
+
+    def __setitem__(self, index, value):
+        start, stop, _ = index.indices(self.size)
+        value = bytes(value)
+        if len(value) != stop - start:
+            raise ValueError("nvm slice assignment can not change its size")
+        cut = self.cut
+        self.cut = None
+        with open(self.path, "r+b") as f:
+            f.seek(start)
+            f.write(value if cut is None else value[:cut])
+        if cut is not None:
+            raise PowerLoss()
+
+
+class Player:
+    """Plays games against the checkpoint; knows what nvm *should* hold."""
+
+    def __init__(self, nvm, rng, loss, torn):
+        self.nvm = nvm
+        self.rng = rng
+        self.loss = loss
+        self.torn = torn
+        self.t = 0
+        self.step = 0
+        self.last_written = None    # session of the last completed write (None: cleared)
+        self.steps = 0
+        self.games = 0
+        self.write_us = []
+
+    def write(self, do_write, session):
+        """One checkpoint write, which power may cut short."""
+        if self.rng.random() < self.torn * self.loss:
+            self.nvm.cut = self.rng.randrange(checkpoint.CP_SIZE)
+        us = do_write()
+        if us >= 0:
+            self.write_us.append(us)
+            self.last_written = session
+
+    def play(self, resume=None):
+        """One game, new or resumed; PowerLoss may end it early."""
+        if resume is None:
+            difficulty = self.rng.randrange(len(DIFFICULTY_NAMES))
+            recipe = [self.rng.randrange(len(ACTION_NAMES))
+                      for _ in range(RECIPE_LENGTHS[difficulty])]
+            self.step = 0
+            score = 0
+            session = (STATE_PLAYING, difficulty, 0, 0, [0, 0, 0], recipe)
+            self.write(lambda: checkpoint.save_now(self.nvm, session), session)
+        else:
+            _, difficulty, self.step, score, _, recipe = resume
+
+        while True:
+            self.t += self.rng.randint(*STEP_MS)
+            if self.rng.random() < self.loss:
+                raise PowerLoss()
+
+            self.step += 1
+            self.steps += 1
+            score += 10
+            if self.step >= len(recipe):
+                self.games += 1
+                self.write(lambda: checkpoint.clear(self.nvm), None)
+                return
+
+            # advance_step() stages, the quiet frames after it write if due
+            session = (STATE_PLAYING, difficulty, self.step, score, [0, 0, 0], recipe)
+            checkpoint.stage(session, self.t)
+            self.t += FRAME_MS
+            if checkpoint.due(self.t):
+                self.write(lambda: checkpoint.flush(self.nvm, self.t), session)
+
+
+def simulate(games, loss, torn, rng, path):
+    nvm = FileNVM(path)
+    checkpoint.load(nvm)
+    player = Player(nvm, rng, loss, torn)
+    outcomes = {"resumed": 0, "menu": 0, "wrong": 0}
+    lost = []
+    resume = None
+
+    while player.games < games:
+        try:
+            player.play(resume)
+            resume = None
+        except PowerLoss:
+            player.nvm = FileNVM(path)              # next boot
+            resume = checkpoint.load(player.nvm)
+            if resume != player.last_written:
+                outcomes["wrong"] += 1
+            elif resume is None:
+                outcomes["menu"] += 1
+            else:
+                outcomes["resumed"] += 1
+                lost.append(player.step - resume[2])
+    return player, outcomes, lost
+
+
+def report(player, outcomes, lost):
+    reboots = sum(outcomes.values())
+    print(f"{player.games} games, {player.steps} cleared steps, {reboots} power losses\n")
+
+    print("outcome after reboot")
+    for name, count in outcomes.items():
+        print(f"  {name:<8} {count:>7}  {100 * count / max(1, reboots):5.1f}%")
+
+    if lost:
+        print(f"\nsteps to repeat after a resume: mean {sum(lost) / len(lost):.2f}  "
+              f"p95 {percentile(lost, 95)}  max {max(lost)}")
+
+    naive = player.steps + 2 * player.games     # one write per step, start and end
+    print(f"\nflash writes: {checkpoint.writes} coalesced vs ~{naive} one per step "
+          f"({checkpoint.writes / max(1, player.steps):.2f} per cleared step, "
+          f"{checkpoint.coalesced} steps folded into a later write)")
+
+    if player.write_us:
+        print(f"write cost on this computer: mean "
+              f"{sum(player.write_us) / len(player.write_us):.0f} us  "
+              f"p95 {percentile(player.write_us, 95)} us  ({checkpoint.CP_SIZE} byte record)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--loss", type=float, default=0.03,
+                        help="chance of a power loss per step")
+    parser.add_argument("--torn", type=float, default=0.5,
+                        help="relative chance of a power loss landing inside a write")
+    parser.add_argument("--seed", type=int, default=36)
+    parser.add_argument("--nvm", help="nvm image file (default: a temporary file)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.nvm:
+        results = simulate(args.games, args.loss, args.torn, rng, args.nvm)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            results = simulate(args.games, args.loss, args.torn, rng,
+                               os.path.join(tmp, "nvm.bin"))
+    report(*results)
+    return 1 if results[1]["wrong"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
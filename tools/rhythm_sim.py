@@ -0,0 +1,196 @@
+"""
+Judgment-accuracy report for RHYTHM mode.
+
+Simulates a player hitting beats with human timing jitter while the game
+loop polls at its real cadence (work + 10 ms sleep, with the occasional
+long frame from a screen redraw). Each input is then stamped two ways:
+
+    poll   - now_ms() of the frame in which get_player_action() reported
+             the action (after TILT / HEAT holds have completed)
+    sample - the instant the deciding input was sampled (what the game
+             uses): the keypad scan timestamp of a button press, the
+             accelerometer read, the onset of a TILT / HEAT hold
+
+and judged with rhythm.judge() from cooking/rhythm.py.
+Like update_playing(), every frame first checks rhythm.step_missed(), so
+an action that is only reported after the step was given up counts as a
+MISS whatever its stamp. The report shows how often each stamp reproduces
+the judgment the player's *true* timing deserved, plus the drift of a
+naive "add the period" beat clock.
+
+Usage:
+    python tools/rhythm_sim.py
+    python tools/rhythm_sim.py --beats 2000 --sigma 30 --seed 7
+"""
+
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from cooking import rhythm  # noqa: E402
+from stats import percentile  # noqa: E402
+
+NS_PER_MS = rhythm.NS_PER_MS
+
+# same cadence as the main loop in cooking/game.py
+LOOP_SLEEP_MS = 10
+WORK_MS = (2, 6)                # usual frame work before the sleep
+PRE_SAMPLE_MS = (0.5, 2.0)      # encoder + HUD work before the input is read
+LONG_FRAME_P = 0.05             # draw_screen() / NeoPixel heavy frames
+LONG_FRAME_MS = (25, 60)
+
+# how long after its deciding sample each action is reported (cooking/gestures.py)
+ACTIONS = ["ADD", "MIX", "HEAT", "TILT"]
+HOLD_MS = {"ADD": 0, "MIX": 0, "HEAT": 300, "TILT": 400}
+
+# ADD comes from keypad.Keys (cooking/hardware.py): scanned every 5 ms and
+# stamped in whole supervisor.ticks_ms()
+BUTTON_SCAN_MS = 5
+
+STAMPS = ["poll", "sample"]
+
+
+def ms(value):
+    return int(value * NS_PER_MS)
+
+
+class Loop:
+    """Frame timing of the main loop."""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.t = 0
+
+    def frame(self):
+        """Run one frame; return (frame_start, sample_instant)."""
+        start = self.t
+        work = self.rng.uniform(*WORK_MS)
+        if self.rng.random() < LONG_FRAME_P:
+            work += self.rng.uniform(*LONG_FRAME_MS)
+        sample = start + ms(self.rng.uniform(*PRE_SAMPLE_MS))
+        self.t = start + ms(work + LOOP_SLEEP_MS)
+        return start, sample
+
+
+def simulate(bpm, beats, sigma_ms, rng):
+    """
+    Return (action, true_offset_ns, {stamp: offset_ns}) per beat.
+
+    The offsets are None when the game gave the step up as a MISS before
+    the action was reported.
+    """
+    loop = Loop(rng)
+    results = []
+    for n in range(1, beats + 1):
+        action = ACTIONS[n % len(ACTIONS)]
+        beat = rhythm.beat_time_ns(0, bpm, 2 * n)
+        hit = beat + ms(rng.gauss(0, sigma_ms))
+        missed = False
+
+        # first frame whose sample sees the input (each frame checks the
+        # MISS deadline before it reads any input)
+        start, sample = loop.frame()
+        while sample < hit:
+            if rhythm.step_missed(start, beat):
+                missed = True
+                break
+            start, sample = loop.frame()
+
+        if action == "ADD":
+            scanned = hit + ms(rng.uniform(0, BUTTON_SCAN_MS))
+            stamp = scanned - scanned % NS_PER_MS
+        else:
+            stamp = sample
+
+        # held actions are only reported once the hold has elapsed; the
+        # hold (known from the next frame on) keeps the step open
+        if HOLD_MS[action] and not missed:
+            done = sample + ms(HOLD_MS[action])
+            start, _ = loop.frame()
+            while start < done:
+                if rhythm.step_missed(start, beat, stamp):
+                    missed = True
+                    break
+                start, _ = loop.frame()
+
+        if missed or rhythm.too_early(stamp - beat):
+            # given up, or ignored as too early (the step then runs out)
+            offsets = {"poll": None, "sample": None}
+        else:
+            offsets = {"poll": start - beat, "sample": stamp - beat}
+        results.append((action, hit - beat, offsets))
+    return results
+
+
+def judge(offset_ns):
+    return rhythm.JUDGE_MISS if offset_ns is None else rhythm.judge(offset_ns)
+
+
+def report(results):
+    print(f"{'stamp':<7} {'action':<6} {'agree':>7} {'mean|err|':>10} {'p95|err|':>9}   "
+          f"{'PERFECT':>7} {'GOOD':>5} {'MISS':>5} {'expired':>7}")
+    for stamp in STAMPS:
+        for action in ACTIONS + ["all"]:
+            rows = [r for r in results if action in ("all", r[0])]
+            agree = 0
+            errors = []
+            counts = [0, 0, 0]
+            expired = 0
+            for _, true_offset, offsets in rows:
+                judged = judge(offsets[stamp])
+                counts[judged] += 1
+                agree += judged == rhythm.judge(true_offset)
+                if offsets[stamp] is None:
+                    expired += 1
+                else:
+                    errors.append(abs(offsets[stamp] - true_offset) / NS_PER_MS)
+            if not errors:
+                errors = [0.0]
+            print(f"{stamp:<7} {action:<6} {100 * agree / len(rows):>6.1f}% "
+                  f"{sum(errors) / len(errors):>8.2f}ms {percentile(errors, 95):>7.2f}ms   "
+                  f"{counts[0]:>7} {counts[1]:>5} {counts[2]:>5} {expired:>7}")
+        print()
+
+    truth = [0, 0, 0]
+    for _, true_offset, _ in results:
+        truth[rhythm.judge(true_offset)] += 1
+    print(f"{'truth':<7} {'all':<6} {'':>7} {'':>10} {'':>9}   "
+          f"{truth[0]:>7} {truth[1]:>5} {truth[2]:>5}")
+
+
+def drift_report(bpm, beats):
+    """Compare the index-based beat clock with naive period accumulation."""
+    period_ms = 60000 // bpm
+    naive = 0
+    for _ in range(beats):
+        naive += period_ms
+    exact = rhythm.beat_time_ns(0, bpm, beats) / NS_PER_MS
+    print(f"\nbeat clock after {beats} beats at {bpm} BPM:")
+    print(f"  index-based (rhythm.py): {exact:.3f} ms")
+    print(f"  accumulated int ms     : {naive} ms  (drift {exact - naive:.1f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bpm", type=int, default=75)
+    parser.add_argument("--beats", type=int, default=1000)
+    parser.add_argument("--sigma", type=float, default=25.0,
+                        help="player timing jitter in ms (std dev)")
+    parser.add_argument("--seed", type=int, default=512)
+    parser.add_argument("--drift-bpm", type=int, default=72,
+                        help="tempo for the drift check (72 has a non-integer period)")
+    args = parser.parse_args()
+
+    results = simulate(args.bpm, args.beats, args.sigma, random.Random(args.seed))
+
+    print(f"{args.beats} actions at {args.bpm} BPM, player jitter {args.sigma} ms\n")
+    report(results)
+    drift_report(args.drift_bpm, args.beats)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
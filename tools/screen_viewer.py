@@ -0,0 +1,231 @@
+"""
+Live viewer for the OLED frames the game streams over usb_cdc.data.
+
+Usage:
+    python tools/screen_viewer.py /dev/ttyACM1                 # window (tkinter)
+    python tools/screen_viewer.py /dev/ttyACM1 --terminal      # text mode
+    python tools/screen_viewer.py /dev/ttyACM1 --save frames/  # also dump .pbm + .cap
+    python tools/screen_viewer.py /dev/ttyACM1 --golden menu.pbm
+
+--save writes every frame twice: as decoded here (.pbm) and as received
+from the board (.cap, the raw 'F' payload). A .cap whose screen has been
+checked against the OLED itself, next to a .pbm of what the OLED showed,
+makes a golden pair for tools/capture_check.py.
+
+With --golden the viewer compares frames against a .pbm image, prints
+the number of differing pixels and exits: status 0 as soon as a frame
+matches pixel for pixel, 1 if none of the first --frames frames does.
+"""
+
+import argparse
+import os
+import struct
+import sys
+
+from cdc_stream import iter_packets, open_port
+
+TYPE_FRAME = 0x46  # 'F'
+
+WIDTH = 128
+HEIGHT = 64
+ROW_BYTES = WIDTH // 8
+
+# must match CAP_HEADER_FMT in cooking/render.py (minus the 4 byte header)
+FRAME_HEADER_FMT = "<HHH"
+FRAME_HEADER_SIZE = struct.calcsize(FRAME_HEADER_FMT)
+
+
+def unpackbits(data):
+    """Decode PackBits data (the inverse of packbits() in cooking/packbits.py)."""
+    out = bytearray()
+    i = 0
+    while i < len(data):
+        header = data[i]
+        i += 1
+        if header < 128:
+            count = header + 1
+            out += data[i:i + count]
+            i += count
+        elif header > 128:
+            out += bytes([data[i]]) * (257 - header)
+            i += 1
+    return bytes(out)
+
+
+def to_pixels(raw, word_swap=True):
+    """
+    Turn a raw 1-bpp displayio bitmap buffer into rows of 0/1.
+
+    displayio stores pixel 0 in the top bit of a 32-bit word, so on the
+    little-endian ESP32 every 4 bytes come out reversed.
+    """
+    rows = []
+    for y in range(HEIGHT):
+        row = raw[y * ROW_BYTES:(y + 1) * ROW_BYTES]
+        if word_swap:
+            row = b"".join(row[w:w + 4][::-1] for w in range(0, ROW_BYTES, 4))
+        bits = []
+        for byte in row:
+            for bit in range(7, -1, -1):
+                bits.append((byte >> bit) & 1)
+        rows.append(bits)
+    return rows
+
+
+def from_pixels(pixels, word_swap=True):
+    """Rows of 0/1 back into a raw displayio bitmap buffer (inverse of to_pixels())."""
+    raw = bytearray()
+    for row in pixels:
+        packed = bytearray(
+            sum(row[x + bit] << (7 - bit) for bit in range(8)) for x in range(0, WIDTH, 8))
+        if word_swap:
+            packed = b"".join(packed[w:w + 4][::-1] for w in range(0, ROW_BYTES, 4))
+        raw += packed
+    return bytes(raw)
+
+
+def decode_frame(payload, word_swap=True):
+    number, compose_us, encode_us = struct.unpack_from(FRAME_HEADER_FMT, payload, 0)
+    raw = unpackbits(payload[FRAME_HEADER_SIZE:])
+    if len(raw) != WIDTH * HEIGHT // 8:
+        raise ValueError(f"frame {number}: {len(raw)} bytes after decoding")
+    return {
+        "number": number,
+        "compose_us": compose_us,
+        "encode_us": encode_us,
+        "size": len(payload) - FRAME_HEADER_SIZE,
+        "pixels": to_pixels(raw, word_swap),
+    }
+
+
+def write_pbm(path, pixels):
+    with open(path, "w") as f:
+        f.write(f"P1\n{WIDTH} {HEIGHT}\n")
+        for row in pixels:
+            f.write(" ".join(str(p) for p in row) + "\n")
+
+
+def read_pbm(path):
+    with open(path) as f:
+        tokens = [t for line in f if not line.startswith("#") for t in line.split()]
+    if tokens[0] != "P1" or tokens[1:3] != [str(WIDTH), str(HEIGHT)]:
+        raise ValueError(f"{path}: expected a {WIDTH}x{HEIGHT} plain PBM (P1)")
+    values = [int(t) for t in tokens[3:]]
+    return [values[y * WIDTH:(y + 1) * WIDTH] for y in range(HEIGHT)]
+
+
+def diff_pixels(a, b):
+    return sum(pa != pb for ra, rb in zip(a, b) for pa, pb in zip(ra, rb))
+
+
+def render_terminal(pixels):
+    """Two pixel rows per text line using half-block characters."""
+    lines = []
+    for y in range(0, HEIGHT, 2):
+        top, bottom = pixels[y], pixels[y + 1]
+        lines.append("".join(" ▄▀█"[t * 2 + b] for t, b in zip(top, bottom)))
+    return "\x1b[H" + "\n".join(lines)
+
+
+class Window:
+    """Scaled-up tkinter window (stdlib only)."""
+
+    def __init__(self, scale):
+        import tkinter
+
+        self.scale = scale
+        self.root = tkinter.Tk()
+        self.root.title("Cooking Game OLED")
+        self.image = tkinter.PhotoImage(width=WIDTH, height=HEIGHT)
+        self.zoomed = self.image.zoom(scale)
+        self.label = tkinter.Label(self.root, image=self.zoomed, bg="black")
+        self.label.pack()
+
+    def show(self, pixels):
+        data = " ".join(
+            "{" + " ".join("#ffffff" if p else "#000000" for p in row) + "}"
+            for row in pixels
+        )
+        self.image.put(data, to=(0, 0))
+        self.zoomed = self.image.zoom(self.scale)
+        self.label.configure(image=self.zoomed)
+        self.root.update()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("port", help="serial device of the board's data port")
+    parser.add_argument("--terminal", action="store_true", help="draw in the terminal")
+    parser.add_argument("--scale", type=int, default=6, help="window zoom factor")
+    parser.add_argument("--save", help="directory to write every frame as .pbm")
+    parser.add_argument("--golden", help=".pbm the screen must match (sets the exit status)")
+    parser.add_argument("--frames", type=int, default=1,
+                        help="with --golden: frames to wait for a match")
+    parser.add_argument("--no-word-swap", action="store_true",
+                        help="bitmap words are already big-endian")
+    args = parser.parse_args()
+
+    golden = read_pbm(args.golden) if args.golden else None
+    if args.save:
+        os.makedirs(args.save, exist_ok=True)
+
+    window = None
+    if not args.terminal:
+        window = Window(args.scale)
+    else:
+        print("\x1b[2J", end="")
+
+    ser = open_port(args.port)
+    status_code = 1 if golden else 0    # no matching frame yet
+    frames = 0
+    compose_total = 0
+    encode_total = 0
+    bytes_total = 0
+    try:
+        for ptype, payload in iter_packets(ser.read):
+            if ptype != TYPE_FRAME:
+                continue
+            try:
+                frame = decode_frame(payload, not args.no_word_swap)
+            except (ValueError, IndexError, struct.error) as e:
+                print(f"bad frame: {e}", file=sys.stderr)
+                continue
+
+            frames += 1
+            compose_total += frame["compose_us"]
+            encode_total += frame["encode_us"]
+            bytes_total += frame["size"]
+
+            if window:
+                window.show(frame["pixels"])
+            else:
+                print(render_terminal(frame["pixels"]))
+
+            status = (f"frame {frame['number']:5d}  {frame['size']:4d} B  "
+                      f"compose {frame['compose_us']:5d} us  encode {frame['encode_us']:5d} us  "
+                      f"| avg {bytes_total / frames:6.1f} B "
+                      f"{compose_total / frames:7.1f} + {encode_total / frames:7.1f} us")
+            diff = diff_pixels(frame["pixels"], golden) if golden else 0
+            if golden:
+                status += f"  | diff vs golden: {diff} px"
+            print(status)
+
+            if args.save:
+                name = os.path.join(args.save, f"frame_{frame['number']:05d}")
+                write_pbm(name + ".pbm", frame["pixels"])
+                with open(name + ".cap", "wb") as f:
+                    f.write(payload)
+
+            if golden and (diff == 0 or frames >= args.frames):
+                status_code = 0 if diff == 0 else 1
+                print("golden: " + ("match" if diff == 0 else "MISMATCH"))
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ser.close()
+    return status_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
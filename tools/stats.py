@@ -0,0 +1,10 @@
+"""
+Summary statistics shared by the host-side simulation reports.
+"""
+
+
+def percentile(values, p):
+    """Nearest-rank p-th percentile (0-100) of a non-empty sequence."""
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[index]
@@ -0,0 +1,175 @@
+"""
+Tail the game's telemetry stream and show it as a live table or CSV.
+
+Usage:
+    python tools/telemetry_host.py /dev/ttyACM1
+    python tools/telemetry_host.py /dev/ttyACM1 --csv run.csv
+
+The data port is the *second* CDC port the board exposes once boot.py
+has enabled it (the first one is the normal REPL console).
+"""
+
+import argparse
+import csv
+import struct
+import sys
+
+from cdc_stream import (
+    TYPE_CHECKPOINT, TYPE_DETECTOR, TYPE_QOS, TYPE_STEP, TYPE_TRANSITION,
+    iter_packets, open_port,
+)
+
+# must match STEP_FMT / DET_FMT / TRANS_FMT / CKPT_FMT in cooking/telemetry.py and
+# QOS_FMT in cooking/qos.py (minus the 4 byte header)
+STEP_PAYLOAD_FMT = "<IBBBBHHHH"
+DET_PAYLOAD_FMT = "<IBBHHHHH"
+TRANS_PAYLOAD_FMT = "<IBBI"
+QOS_PAYLOAD_FMT = "<IBHHHHHHHH"
+CKPT_PAYLOAD_FMT = "<IBIHH"
+
+EVENTS = [
+    "START", "CLEAR", "TIMEOUT", "HEAT_TIMEOUT", "WRONG_MOVE", "WIN",
+    "PERFECT", "GOOD", "MISS", "RESUME",
+]
+ACTIONS = ["ADD", "MIX", "HEAT", "TILT", "STIR", "FLIP"]
+
+# registration order of register_detector() calls in cooking/gestures.py
+DETECTORS = ["ADD", "WRONG_SHAKE", "HEAT", "MIX", "TILT", "STIR", "FLIP"]
+DIFFICULTIES = ["EASY", "NORMAL", "HARD", "RHYTHM"]
+
+COLUMNS = [
+    "t_ms", "event", "step", "action", "difficulty",
+    "latency_ms", "score", "peak_delta", "samples",
+]
+
+
+def lookup(names, index):
+    if 0 <= index < len(names):
+        return names[index]
+    return "-" if index == 255 else str(index)
+
+
+def decode_step(payload):
+    (t_ms, event, step, action, diff,
+     latency, score, peak, samples) = struct.unpack(STEP_PAYLOAD_FMT, payload)
+    return {
+        "t_ms": t_ms,
+        "event": lookup(EVENTS, event),
+        "step": step + 1,
+        "action": lookup(ACTIONS, action),
+        "difficulty": lookup(DIFFICULTIES, diff),
+        "latency_ms": latency,
+        "score": score,
+        "peak_delta": peak / 100,
+        "samples": samples,
+    }
+
+
+def decode_detector(payload):
+    (t_ms, det_id, action, avg_us, max_us,
+     runs, skipped, frame_us) = struct.unpack(DET_PAYLOAD_FMT, payload)
+    return (f"{t_ms:>10} detector {lookup(DETECTORS, det_id):<12} "
+            f"step {lookup(ACTIONS, action):<5} avg {avg_us:5d} us  max {max_us:5d} us  "
+            f"runs {runs:5d}  skipped {skipped:4d}  | frame {frame_us:5d} us")
+
+
+SHED_LEVELS = ["full", "no LED", "no LED/redraw", "no LED/redraw/HUD"]
+
+
+def decode_qos(payload):
+    (t_ms, level, frames, overruns, worst_us, raises, restores,
+     shed_led, shed_redraw, shed_hud) = struct.unpack(QOS_PAYLOAD_FMT, payload)
+    return (f"{t_ms:>10} qos {lookup(SHED_LEVELS, level):<18} "
+            f"frames {frames:5d} overruns {overruns:4d} worst {worst_us:5d} us  "
+            f"up {raises:3d} down {restores:3d}  "
+            f"shed LED {shed_led:5d} redraw {shed_redraw:4d} HUD {shed_hud:4d}")
+
+
+def decode_checkpoint(payload):
+    t_ms, step, us, writes, coalesced = struct.unpack(CKPT_PAYLOAD_FMT, payload)
+    return (f"{t_ms:>10} checkpoint at step {step + 1:<3} write {us:6d} us  "
+            f"writes {writes:4d}  coalesced steps {coalesced:4d}")
+
+
+class TransitionStats:
+    """Running step-transition latency, split by prefetched / built on the spot."""
+
+    def __init__(self):
+        self.count = [0, 0]
+        self.total = [0, 0]
+        self.worst = [0, 0]
+
+    def add(self, payload):
+        t_ms, step, prefetched, us = struct.unpack(TRANS_PAYLOAD_FMT, payload)
+        self.count[prefetched] += 1
+        self.total[prefetched] += us
+        self.worst[prefetched] = max(self.worst[prefetched], us)
+        kind = "prefetched" if prefetched else "built"
+        summary = "  ".join(
+            f"{name} avg {self.total[i] / self.count[i]:7.0f} us "
+            f"max {self.worst[i]:6d} us (n={self.count[i]})"
+            for i, name in ((1, "prefetched"), (0, "built")) if self.count[i]
+        )
+        return f"{t_ms:>10} transition to step {step + 1:<3} {kind:<10} {us:6d} us  | {summary}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("port", help="serial device of the board's data port")
+    parser.add_argument("--csv", help="also append rows to this CSV file")
+    parser.add_argument("--costs", action="store_true",
+                        help="also show detector cost, step transition, frame deadline "
+                             "and checkpoint write records")
+    args = parser.parse_args()
+
+    ser = open_port(args.port)
+
+    writer = None
+    csv_file = None
+    if args.csv:
+        csv_file = open(args.csv, "a", newline="")
+        writer = csv.DictWriter(csv_file, fieldnames=COLUMNS)
+        if csv_file.tell() == 0:
+            writer.writeheader()
+
+    row_fmt = "{:>10} {:<12} {:>4} {:<6} {:<7} {:>10} {:>6} {:>10} {:>7}"
+    print(row_fmt.format(*COLUMNS))
+
+    transitions = TransitionStats()
+
+    try:
+        for ptype, payload in iter_packets(ser.read):
+            if ptype == TYPE_TRANSITION and args.costs:
+                if len(payload) == struct.calcsize(TRANS_PAYLOAD_FMT):
+                    print(transitions.add(payload))
+                continue
+            if ptype == TYPE_QOS and args.costs:
+                if len(payload) == struct.calcsize(QOS_PAYLOAD_FMT):
+                    print(decode_qos(payload))
+                continue
+            if ptype == TYPE_CHECKPOINT and args.costs:
+                if len(payload) == struct.calcsize(CKPT_PAYLOAD_FMT):
+                    print(decode_checkpoint(payload))
+                continue
+            if ptype == TYPE_DETECTOR and args.costs:
+                if len(payload) == struct.calcsize(DET_PAYLOAD_FMT):
+                    print(decode_detector(payload))
+                continue
+            if ptype != TYPE_STEP or len(payload) != struct.calcsize(STEP_PAYLOAD_FMT):
+                continue
+            row = decode_step(payload)
+            print(row_fmt.format(*[row[c] for c in COLUMNS]))
+            if writer:
+                writer.writerow(row)
+                csv_file.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ser.close()
+        if csv_file:
+            csv_file.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())